@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Benchmark: access_nested_map vs compiled getters vs extract_many.
+Scales the repos of fixtures.TEST_PAYLOAD and pulls ("license", "key")
+and ("name",) out of every repo with each approach.
+Usage:
+    python3 bench_access.py [scale] [rounds]
+"""
+import sys
+import time
+from typing import Callable, List
+
+from fixtures import TEST_PAYLOAD
+from utils import access_nested_map, compile_path, extract_many
+
+
+def with_access_nested_map(records: List, path: tuple) -> List:
+    """Baseline: one access_nested_map call per record"""
+    values = []
+    for record in records:
+        try:
+            values.append(access_nested_map(record, path))
+        except KeyError:
+            values.append(None)
+    return values
+
+
+def with_compiled_getter(records: List, path: tuple) -> List:
+    """One compiled getter call per record"""
+    getter = compile_path(path)
+    values = []
+    for record in records:
+        try:
+            values.append(getter(record))
+        except KeyError:
+            values.append(None)
+    return values
+
+
+def with_extract_many(records: List, path: tuple) -> List:
+    """Single extract_many pass"""
+    return extract_many(records, path, None)
+
+
+def best_of(func: Callable, records: List, path: tuple, rounds: int) -> float:
+    """Best wall time of func over rounds runs"""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(records, path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    records = TEST_PAYLOAD[0][1] * scale
+
+    print("records={}".format(len(records)))
+    print("{:>14} {:>22} {:>10} {:>8}".format(
+        "path", "approach", "seconds", "speedup"))
+    for path in (("license", "key"), ("name",)):
+        expected = with_access_nested_map(records, path)
+        baseline = None
+        for func in (with_access_nested_map, with_compiled_getter,
+                     with_extract_many):
+            assert func(records, path) == expected, func.__name__
+            seconds = best_of(func, records, path, rounds)
+            baseline = baseline or seconds
+            print("{:>14} {:>22} {:>10.4f} {:>7.2f}x".format(
+                ".".join(path), func.__name__, seconds, baseline / seconds))
+
+
+if __name__ == "__main__":
+    main()
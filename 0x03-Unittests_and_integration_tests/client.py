@@ -1,18 +1,73 @@
 #!/usr/bin/env python3
 """A github org client
 """
+import heapq
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from typing import (
     List,
     Dict,
+    Iterable,
+    Iterator,
+    Union,
 )
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 
 from utils import (
     get_json,
-    access_nested_map,
-    memoize,
+    get_json_with_links,
+    compile_path,
+    extract_many,
+    memoize_safe,
 )
 
 
+def page_urls(last_url: str, first: int = 2) -> List[str]:
+    """URLs of pages first..N given the rel="last" URL of page N"""
+    parts = urlparse(last_url)
+    query = parse_qs(parts.query)
+    last = int(query.get("page", ["1"])[0])
+    urls = []
+    for page in range(first, last + 1):
+        query["page"] = [str(page)]
+        page_query = urlencode(query, doseq=True)
+        urls.append(urlunparse(parts._replace(query=page_query)))
+    return urls
+
+
+_license_key = compile_path(("license", "key"))
+
+
+class LicenseIndex:
+    """Inverted index of a repos payload: license key -> repo positions.
+    Built in one pass; lookups of one or several licenses then touch only
+    the matching repos and keep their payload order.
+    """
+
+    def __init__(self, repos: List[Dict]) -> None:
+        """Index repos; those without a license key are left out"""
+        self.source = repos
+        self.names = extract_many(repos, ("name",))
+        self.positions: Dict[str, List[int]] = {}
+        for position, key in enumerate(
+                extract_many(repos, ("license", "key"), None)):
+            if key is not None:
+                self.positions.setdefault(key, []).append(position)
+
+    def repos(self, licenses: Iterable[str]) -> List[str]:
+        """Names of the repos under any of licenses, in payload order"""
+        matches = [self.positions.get(key, ())
+                   for key in dict.fromkeys(licenses)]
+        if len(matches) == 1:
+            return [self.names[position] for position in matches[0]]
+        return [self.names[position] for position in heapq.merge(*matches)]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of repos per license key"""
+        return {key: len(positions)
+                for key, positions in self.positions.items()}
+
+
 class GithubOrgClient:
     """A Githib org client
     """
@@ -22,7 +77,7 @@ class GithubOrgClient:
         """Init method of GithubOrgClient"""
         self._org_name = org_name
 
-    @memoize
+    @memoize_safe
     def org(self) -> Dict:
         """Memoize org"""
         return get_json(self.ORG_URL.format(org=self._org_name))
@@ -32,27 +87,109 @@ class GithubOrgClient:
         """Public repos URL"""
         return self.org["repos_url"]
 
-    @memoize
+    @memoize_safe
     def repos_payload(self) -> Dict:
         """Memoize repos payload"""
         return get_json(self._public_repos_url)
 
-    def public_repos(self, license: str = None) -> List[str]:
-        """Public repos"""
-        json_payload = self.repos_payload
-        public_repos = [
-            repo["name"] for repo in json_payload
-            if license is None or self.has_license(repo, license)
-        ]
+    def iter_repos(self, max_workers: int = 4,
+                   ordered: bool = False) -> Iterator[Dict]:
+        """Stream every repo of the org across all pages.
+        The first page's Link header gives the last page number; the
+        remaining pages are then fetched concurrently, with at most
+        max_workers requests in flight, and their repos yielded as each
+        page arrives (or in page order when ordered is True). When only a
+        rel="next" link is given, pages are followed one by one.
+        """
+        page, links = get_json_with_links(self._public_repos_url)
+        yield from page
+
+        if "last" not in links:
+            while "next" in links:
+                page, links = get_json_with_links(links["next"])
+                yield from page
+            return
+
+        urls = iter(page_urls(links["last"]))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            def submit_next():
+                url = next(urls, None)
+                return None if url is None else executor.submit(get_json, url)
+
+            pending = deque()
+            for _ in range(max_workers):
+                future = submit_next()
+                if future is None:
+                    break
+                pending.append(future)
+
+            try:
+                while pending:
+                    if ordered:
+                        done = [pending.popleft()]
+                    else:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            pending.remove(future)
+                    for future in done:
+                        following = submit_next()
+                        if following is not None:
+                            pending.append(following)
+                        yield from future.result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    @memoize_safe
+    def all_repos_payload(self) -> List[Dict]:
+        """Memoize repos of every page, in page order"""
+        return list(self.iter_repos(ordered=True))
+
+    def _index_of(self, attr_name: str, repos: List[Dict]) -> LicenseIndex:
+        """License index of repos, kept in attr_name and rebuilt whenever
+        repos is not the payload it was built from (e.g. after the
+        payload was invalidated or expired)"""
+        index = self.__dict__.get(attr_name)
+        if index is None or index.source is not repos:
+            index = LicenseIndex(repos)
+            self.__dict__[attr_name] = index
+        return index
+
+    @property
+    def license_index(self) -> LicenseIndex:
+        """License index of the current repos_payload"""
+        return self._index_of("_license_index", self.repos_payload)
+
+    @property
+    def all_license_index(self) -> LicenseIndex:
+        """License index of the current all_repos_payload"""
+        return self._index_of("_all_license_index", self.all_repos_payload)
+
+    def public_repos(self, license: Union[str, Iterable[str]] = None,
+                     all_pages: bool = False) -> List[str]:
+        """Public repos, optionally only those under license.
+        license may be one key or several; repos under any of them are
+        returned, looked up in the memoized license index.
+        """
+        index = self.all_license_index if all_pages else self.license_index
+        if license is None:
+            return list(index.names)
+        licenses = [license] if isinstance(license, str) else list(license)
+        for key in licenses:
+            assert key is not None, "license_key cannot be None"
+        return index.repos(licenses)
 
-        return public_repos
+    def license_counts(self, all_pages: bool = False) -> Dict[str, int]:
+        """Number of public repos per license key"""
+        index = self.all_license_index if all_pages else self.license_index
+        return index.counts()
 
     @staticmethod
     def has_license(repo: Dict[str, Dict], license_key: str) -> bool:
         """Static: has_license"""
         assert license_key is not None, "license_key cannot be None"
         try:
-            has_license = access_nested_map(repo, ("license", "key")) == license_key
+            has_license = _license_key(repo) == license_key
         except KeyError:
             return False
         return has_license
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Unit and integration tests for client module.
+"""
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from unittest.mock import patch, PropertyMock
+from urllib.parse import urlparse, parse_qs
+
+from client import GithubOrgClient, LicenseIndex, page_urls
+from fixtures import TEST_PAYLOAD
+from utils import configure_http_client
+
+ORG_PAYLOAD, REPOS_PAYLOAD, EXPECTED_REPOS, APACHE2_REPOS = TEST_PAYLOAD[0]
+
+
+class FakeGithubHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the GitHub org and paginated repos API."""
+
+    per_page = 2
+    with_last = True
+    requests_seen: List[str] = []
+
+    def do_GET(self) -> None:
+        """Serve the org payload or one page of repos."""
+        FakeGithubHandler.requests_seen.append(self.path)
+        parts = urlparse(self.path)
+        base = "http://{}:{}".format(*self.server.server_address)
+        headers: Dict[str, str] = {}
+        if parts.path == "/orgs/google":
+            body = dict(ORG_PAYLOAD, repos_url=base + "/orgs/google/repos")
+        else:
+            page = int(parse_qs(parts.query).get("page", ["1"])[0])
+            size = FakeGithubHandler.per_page
+            last = -(-len(REPOS_PAYLOAD) // size)
+            body = REPOS_PAYLOAD[(page - 1) * size:page * size]
+            links = []
+            if page < last:
+                links.append('<{}/orgs/google/repos?page={}>; rel="next"'
+                             .format(base, page + 1))
+                if FakeGithubHandler.with_last:
+                    links.append('<{}/orgs/google/repos?page={}>; rel="last"'
+                                 .format(base, last))
+            if links:
+                headers["Link"] = ", ".join(links)
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args) -> None:
+        """Keep test output quiet."""
+
+
+class TestPageUrls(unittest.TestCase):
+    """Test cases for page_urls."""
+
+    def test_page_urls(self) -> None:
+        """Test page URLs keep other query parameters."""
+        self.assertEqual(
+            page_urls("https://api.github.com/orgs/x/repos?per_page=2&page=4"),
+            ["https://api.github.com/orgs/x/repos?per_page=2&page=2",
+             "https://api.github.com/orgs/x/repos?per_page=2&page=3",
+             "https://api.github.com/orgs/x/repos?per_page=2&page=4"],
+        )
+
+
+class TestLicenseIndex(unittest.TestCase):
+    """Test cases for the memoized license index."""
+
+    def setUp(self) -> None:
+        """Serve the fixture repos as the org's first page."""
+        patcher = patch.object(GithubOrgClient, "repos_payload",
+                               new_callable=PropertyMock,
+                               return_value=REPOS_PAYLOAD)
+        self.mock_payload = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = GithubOrgClient("google")
+
+    def test_public_repos_with_license(self) -> None:
+        """Test a single license matches the linear scan."""
+        self.assertEqual(self.client.public_repos("apache-2.0"),
+                         APACHE2_REPOS)
+        self.assertEqual(self.client.public_repos(), EXPECTED_REPOS)
+
+    def test_public_repos_with_several_licenses(self) -> None:
+        """Test several licenses return the union in payload order."""
+        licenses = ["bsd-3-clause", "apache-2.0"]
+        expected = [
+            repo["name"] for repo in REPOS_PAYLOAD
+            if any(GithubOrgClient.has_license(repo, key)
+                   for key in licenses)
+        ]
+        self.assertEqual(self.client.public_repos(licenses), expected)
+        self.assertEqual(self.client.public_repos(["no-such-license"]), [])
+
+    def test_license_counts(self) -> None:
+        """Test counts per license key."""
+        counts = self.client.license_counts()
+        self.assertEqual(counts["apache-2.0"], len(APACHE2_REPOS))
+        self.assertEqual(sum(counts.values()), len([
+            repo for repo in REPOS_PAYLOAD if repo.get("license")
+        ]))
+
+    def test_index_built_once(self) -> None:
+        """Test repeated queries reuse the memoized index."""
+        with patch("client.LicenseIndex", wraps=LicenseIndex) as mock_index:
+            self.client.public_repos("apache-2.0")
+            self.client.public_repos(["mit", "bsd-3-clause"])
+            self.client.license_counts()
+        mock_index.assert_called_once_with(REPOS_PAYLOAD)
+
+    def test_index_follows_new_payload(self) -> None:
+        """Test a new repos payload (e.g. after invalidate) is reindexed."""
+        self.client.public_repos("apache-2.0")
+        self.mock_payload.return_value = REPOS_PAYLOAD[:1]
+        self.assertEqual(self.client.public_repos(),
+                         [REPOS_PAYLOAD[0]["name"]])
+
+
+class TestPaginatedPublicRepos(unittest.TestCase):
+    """Integration tests for Link-header pagination against a fake API."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Start the fake API and point GithubOrgClient at it."""
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGithubHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        org_url = "http://127.0.0.1:{}/orgs/{{org}}".format(
+            cls.server.server_port)
+        cls.org_url_patcher = patch.object(GithubOrgClient, "ORG_URL", org_url)
+        cls.org_url_patcher.start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """Stop the fake API."""
+        cls.org_url_patcher.stop()
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self) -> None:
+        """Fresh HTTP client and request log for every test."""
+        configure_http_client()
+        FakeGithubHandler.requests_seen = []
+        FakeGithubHandler.with_last = True
+
+    def test_public_repos_all_pages(self) -> None:
+        """Test every page is fetched and repos keep page order."""
+        client = GithubOrgClient("google")
+        self.assertEqual(client.public_repos(all_pages=True), EXPECTED_REPOS)
+        pages = [p for p in FakeGithubHandler.requests_seen if "repos" in p]
+        self.assertEqual(len(pages), 5)
+
+    def test_public_repos_all_pages_with_license(self) -> None:
+        """Test license filtering applies across all pages."""
+        client = GithubOrgClient("google")
+        self.assertEqual(
+            client.public_repos(license="apache-2.0", all_pages=True),
+            APACHE2_REPOS,
+        )
+
+    def test_iter_repos_unordered(self) -> None:
+        """Test streaming without ordering yields every repo once."""
+        client = GithubOrgClient("google")
+        names = [repo["name"] for repo in client.iter_repos(ordered=False)]
+        self.assertCountEqual(names, EXPECTED_REPOS)
+
+    def test_iter_repos_follows_next_links(self) -> None:
+        """Test pages are followed sequentially without a last link."""
+        FakeGithubHandler.with_last = False
+        client = GithubOrgClient("google")
+        names = [repo["name"] for repo in client.iter_repos()]
+        self.assertEqual(names, EXPECTED_REPOS)
+
+    def test_first_page_only_by_default(self) -> None:
+        """Test public_repos keeps returning only the first page."""
+        client = GithubOrgClient("google")
+        self.assertEqual(client.public_repos(),
+                         EXPECTED_REPOS[:FakeGithubHandler.per_page])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -108,10 +108,26 @@
 """
 Unit tests for utils module.
 """
+import asyncio
+import json
+import shutil
+import tempfile
+import threading
 import unittest
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch, MagicMock
 from parameterized import parameterized
-from utils import access_nested_map, get_json, memoize
+from utils import (
+    access_nested_map,
+    compile_path,
+    extract_many,
+    get_json,
+    memoize,
+    memoize_safe,
+    CachingHttpClient,
+    configure_http_client,
+)
 from typing import Dict, Tuple, Union
 
 
@@ -149,14 +165,66 @@ class TestAccessNestedMap(unittest.TestCase):
         self.assertEqual(str(context.exception), f"'{expected_key}'")
 
 
+class TestCompilePath(unittest.TestCase):
+    """Test cases for compile_path and extract_many."""
+
+    @parameterized.expand([
+        ({"a": 1}, ("a",), 1),
+        ({"a": {"b": 2}}, ("a", "b"), 2),
+        ({"a": {"b": {"c": 3}}}, ("a", "b", "c"), 3),
+        (OrderedDict(a=OrderedDict(b=2)), ("a", "b"), 2),
+    ])
+    def test_compile_path(
+            self,
+            nested_map: Dict,
+            path: Tuple[str],
+            expected: int
+    ) -> None:
+        """Test compiled getters match access_nested_map."""
+        self.assertEqual(compile_path(path)(nested_map), expected)
+
+    @parameterized.expand([
+        ({}, ("a",), "a"),
+        ({"a": 1}, ("a", "b"), "b"),
+        ({"a": None}, ("a", "b"), "b"),
+        ({"a": {"b": "x"}}, ("a", "b", "c"), "c"),
+    ])
+    def test_compile_path_exception(
+            self,
+            nested_map: Dict,
+            path: Tuple[str],
+            expected_key: str
+    ) -> None:
+        """Test compiled getters raise KeyError like access_nested_map."""
+        with self.assertRaises(KeyError) as context:
+            compile_path(path)(nested_map)
+        self.assertEqual(str(context.exception), f"'{expected_key}'")
+
+    def test_compile_path_is_cached(self) -> None:
+        """Test the same path compiles to the same getter."""
+        self.assertIs(compile_path(["a", "b"]), compile_path(("a", "b")))
+
+    def test_extract_many(self) -> None:
+        """Test extract_many with and without a default."""
+        records = [{"license": {"key": "mit"}}, {"license": None}]
+        self.assertEqual(extract_many(records, ("license", "key"), None),
+                         ["mit", None])
+        with self.assertRaises(KeyError):
+            extract_many(records, ("license", "key"))
+
+
 class TestGetJson(unittest.TestCase):
     """Test cases for get_json function."""
 
+    def setUp(self) -> None:
+        """Start every test with an empty shared client."""
+        configure_http_client()
+
     @parameterized.expand([
         ("http://example.com", {"payload": True}),
         ("http://holberton.io", {"payload": False}),
     ])
-    @patch('utils.requests.get')
+    @patch('utils.requests.Session.get')
     def test_get_json(
             self,
             test_url: str,
@@ -164,7 +232,7 @@ class TestGetJson(unittest.TestCase):
             mock_get: MagicMock) -> None:
         """Test get_json returns correct data."""
         # Setup mock response
-        mock_response = MagicMock()
+        mock_response = MagicMock(status_code=200, headers={})
         mock_response.json.return_value = test_payload
         mock_get.return_value = mock_response
 
@@ -172,10 +240,124 @@ class TestGetJson(unittest.TestCase):
         result = get_json(test_url)
 
         # Assertions
-        mock_get.assert_called_once_with(test_url)
+        mock_get.assert_called_once_with(test_url, headers={}, timeout=10.0)
         self.assertEqual(result, test_payload)
 
 
+class FakeApiHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the GitHub API with ETag support."""
+
+    requests_seen = []
+    etag = '"v1"'
+
+    def do_GET(self) -> None:
+        """Serve a JSON payload, or 304 when the ETag matches."""
+        FakeApiHandler.requests_seen.append(
+            (self.path, self.headers.get("If-None-Match")))
+        if self.headers.get("If-None-Match") == FakeApiHandler.etag:
+            self.send_response(304)
+            self.send_header("ETag", FakeApiHandler.etag)
+            self.end_headers()
+            return
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", FakeApiHandler.etag)
+        if self.path.startswith("/fresh"):
+            self.send_header("Cache-Control", "max-age=60")
+        elif self.path.startswith("/private"):
+            self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        """Keep test output quiet."""
+
+
+class TestCachingHttpClient(unittest.TestCase):
+    """Test CachingHttpClient against a local HTTP server."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Start the fake API server."""
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeApiHandler)
+        cls.base_url = "http://127.0.0.1:{}".format(cls.server.server_port)
+        cls.thread = threading.Thread(target=cls.server.serve_forever,
+                                      daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """Stop the fake API server."""
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self) -> None:
+        """Reset the request log and create a scratch cache dir."""
+        FakeApiHandler.requests_seen = []
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        """Remove the scratch cache dir."""
+        shutil.rmtree(self.cache_dir)
+
+    def test_revalidates_with_etag(self) -> None:
+        """Test a repeated lookup sends If-None-Match and reuses the body."""
+        client = CachingHttpClient()
+        url = self.base_url + "/orgs/google"
+        first = client.get_json(url)
+        second = client.get_json(url)
+        self.assertEqual(first, {"path": "/orgs/google"})
+        self.assertEqual(second, first)
+        self.assertEqual(FakeApiHandler.requests_seen,
+                         [("/orgs/google", None), ("/orgs/google", '"v1"')])
+        self.assertEqual((client.misses, client.revalidations), (1, 1))
+
+    def test_fresh_entry_skips_request(self) -> None:
+        """Test max-age responses are served from memory."""
+        client = CachingHttpClient()
+        url = self.base_url + "/fresh/orgs/google"
+        client.get_json(url)
+        client.get_json(url)
+        self.assertEqual(len(FakeApiHandler.requests_seen), 1)
+        self.assertEqual(client.hits, 1)
+
+    def test_no_store_is_not_cached(self) -> None:
+        """Test no-store responses are fetched again without validators."""
+        client = CachingHttpClient()
+        url = self.base_url + "/private/orgs/google"
+        client.get_json(url)
+        client.get_json(url)
+        self.assertEqual(FakeApiHandler.requests_seen,
+                         [("/private/orgs/google", None)] * 2)
+
+    def test_cached_body_is_a_copy(self) -> None:
+        """Test mutating a result leaves the cached body unchanged."""
+        client = CachingHttpClient()
+        url = self.base_url + "/fresh/orgs/google"
+        client.get_json(url)["path"] = "changed"
+        self.assertEqual(client.get_json(url),
+                         {"path": "/fresh/orgs/google"})
+
+    def test_disk_tier_shared_between_clients(self) -> None:
+        """Test a new client revalidates from the on-disk tier."""
+        url = self.base_url + "/orgs/abc"
+        CachingHttpClient(cache_dir=self.cache_dir).get_json(url)
+        client = CachingHttpClient(cache_dir=self.cache_dir)
+        self.assertEqual(client.get_json(url), {"path": "/orgs/abc"})
+        self.assertEqual(FakeApiHandler.requests_seen[-1],
+                         ("/orgs/abc", '"v1"'))
+
+    def test_memory_tier_is_bounded(self) -> None:
+        """Test the memory tier evicts least recently used entries."""
+        client = CachingHttpClient(max_entries=1)
+        client.get_json(self.base_url + "/a")
+        client.get_json(self.base_url + "/b")
+        client.get_json(self.base_url + "/a")
+        self.assertEqual(FakeApiHandler.requests_seen[-1], ("/a", None))
+
+
 class TestMemoize(unittest.TestCase):
     """Test cases for memoize decorator."""
 
@@ -206,5 +388,96 @@ class TestMemoize(unittest.TestCase):
             mock_method.assert_called_once()
 
 
+class TestMemoizeSafe(unittest.TestCase):
+    """Test cases for the thread-safe memoize_safe decorator."""
+
+    def test_single_flight(self) -> None:
+        """Test concurrent first accesses compute the value once."""
+        calls = []
+        started = threading.Event()
+
+        class TestClass:
+            @memoize_safe
+            def a_property(self):
+                calls.append(1)
+                started.wait(1)
+                return 42
+
+        test_obj = TestClass()
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                test_obj.a_property))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        started.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [42] * 8)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(TestClass.a_property.stats(),
+                         {"hits": 7, "misses": 1})
+
+    def test_ttl_and_invalidate(self) -> None:
+        """Test values expire after ttl and on invalidate."""
+        values = iter(range(10))
+
+        class TestClass:
+            @memoize_safe(ttl=60)
+            def a_property(self):
+                return next(values)
+
+        test_obj = TestClass()
+        self.assertEqual(test_obj.a_property, 0)
+        self.assertEqual(test_obj.a_property, 0)
+        TestClass.a_property.invalidate(test_obj)
+        self.assertEqual(test_obj.a_property, 1)
+        with patch("utils.time.monotonic", return_value=1e12):
+            self.assertEqual(test_obj.a_property, 2)
+        self.assertEqual(TestClass.a_property.stats(),
+                         {"hits": 1, "misses": 3})
+
+    def test_per_instance(self) -> None:
+        """Test each instance keeps its own value."""
+
+        class TestClass:
+            def __init__(self, value):
+                self.value = value
+
+            @memoize_safe
+            def a_property(self):
+                return self.value
+
+        self.assertEqual(TestClass(1).a_property, 1)
+        self.assertEqual(TestClass(2).a_property, 2)
+
+    def test_async_single_flight(self) -> None:
+        """Test concurrent awaits share one computation."""
+        calls = []
+
+        class TestClass:
+            @memoize_safe
+            async def a_property(self):
+                calls.append(1)
+                await asyncio.sleep(0.01)
+                return 42
+
+        async def run():
+            test_obj = TestClass()
+            first = await asyncio.gather(
+                *(test_obj.a_property for _ in range(5)))
+            return first, await test_obj.a_property
+
+        first, again = asyncio.run(run())
+        self.assertEqual(first, [42] * 5)
+        self.assertEqual(again, 42)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(TestClass.a_property.stats(),
+                         {"hits": 5, "misses": 1})
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -1,20 +1,42 @@
 #!/usr/bin/env python3
 """Generic utilities for github org client.
 """
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
 import requests
-from functools import wraps
+from requests.adapters import HTTPAdapter
+from functools import lru_cache, wraps
 from typing import (
+    Iterable,
+    List,
     Mapping,
     Sequence,
     Any,
     Dict,
     Callable,
+    Optional,
+    Tuple,
 )
 
 __all__ = [
     "access_nested_map",
+    "compile_path",
+    "extract_many",
     "get_json",
+    "get_json_with_links",
     "memoize",
+    "memoize_safe",
+    "MemoizedProperty",
+    "CachingHttpClient",
+    "configure_http_client",
 ]
 
 
@@ -40,11 +62,327 @@ def access_nested_map(nested_map: Mapping, path: Sequence) -> Any:
     return nested_map
 
 
+_MISSING = object()
+
+
+def compile_path(path: Sequence) -> Callable[[Mapping], Any]:
+    """Compile a key path into a reusable getter.
+    The getter behaves like ``access_nested_map(nested_map, path)`` but
+    checks ``type(value) is dict`` first at each level, so plain JSON
+    payloads skip the Mapping ABC check. Getters are cached per path.
+    Example
+    -------
+    >>> license_key = compile_path(("license", "key"))
+    >>> license_key({"license": {"key": "mit"}})
+    'mit'
+    """
+    return _compile_path(tuple(path))
+
+
+@lru_cache(maxsize=256)
+def _compile_path(path: Tuple) -> Callable[[Mapping], Any]:
+    """Build the getter of compile_path"""
+    if len(path) == 1:
+        key, = path
+
+        def getter(nested_map):
+            if type(nested_map) is not dict and not isinstance(
+                    nested_map, Mapping):
+                raise KeyError(key)
+            return nested_map[key]
+        return getter
+
+    if len(path) == 2:
+        first, second = path
+
+        def getter(nested_map):
+            if type(nested_map) is dict:
+                value = nested_map[first]
+                if type(value) is dict:
+                    return value[second]
+            return access_nested_map(nested_map, path)
+        return getter
+
+    def getter(nested_map):
+        value = nested_map
+        for key in path:
+            if type(value) is not dict and not isinstance(value, Mapping):
+                raise KeyError(key)
+            value = value[key]
+        return value
+    return getter
+
+
+def extract_many(records: Iterable[Mapping], path: Sequence,
+                 default: Any = _MISSING) -> List:
+    """Pull the value at path out of every record in one pass.
+    Parameters
+    ----------
+    records: Iterable[Mapping]
+        Payloads, e.g. the repos of a GitHub org
+    path: Sequence
+        Key path, as for access_nested_map
+    default: Any
+        Value used for records missing the path; without it the KeyError
+        propagates
+    Example
+    -------
+    >>> extract_many([{"a": {"b": 1}}, {"a": None}], ("a", "b"), None)
+    [1, None]
+    """
+    getter = compile_path(path)
+    if default is _MISSING:
+        return [getter(record) for record in records]
+    values = []
+    append = values.append
+    for record in records:
+        try:
+            append(getter(record))
+        except KeyError:
+            append(default)
+    return values
+
+
+class CachingHttpClient:
+    """HTTP JSON client with connection pooling and a two-tier cache.
+    Requests go through one keep-alive ``requests.Session``. Successful
+    responses carrying an ETag, Last-Modified or Cache-Control max-age are
+    kept in an in-memory LRU tier and, when ``cache_dir`` is set, in an
+    on-disk tier. Entries still fresh according to max-age are served
+    without any request; stale ones are revalidated with If-None-Match /
+    If-Modified-Since and a 304 reuses the cached body.
+    Parameters
+    ----------
+    cache_dir: Optional[str]
+        Directory of the on-disk tier, or None for memory only
+    max_entries: int
+        Capacity of the in-memory LRU tier
+    timeout: float
+        Seconds before a request is abandoned
+    pool_size: int
+        Keep-alive connections kept per host
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None,
+                 max_entries: int = 128, timeout: float = 10.0,
+                 pool_size: int = 10) -> None:
+        """Init method of CachingHttpClient"""
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._session_lock = threading.Lock()
+        self._session: Optional[requests.Session] = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @property
+    def session(self) -> requests.Session:
+        """Pooled session, created once on first use"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.pool_size,
+                                          pool_maxsize=self.pool_size)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+        return self._session
+
+    def _disk_path(self, url: str) -> str:
+        """File holding the on-disk entry for url"""
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest + ".json")
+
+    def _load(self, url: str) -> Optional[Dict]:
+        """Cached entry for url from memory, then disk"""
+        with self._lock:
+            entry = self._memory.get(url)
+            if entry is not None:
+                self._memory.move_to_end(url)
+                return entry
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(url), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._remember(url, entry)
+        return entry
+
+    def _remember(self, url: str, entry: Dict) -> None:
+        """Put an entry in the memory tier, evicting the LRU one"""
+        with self._lock:
+            self._memory[url] = entry
+            self._memory.move_to_end(url)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _forget(self, url: str) -> None:
+        """Drop the entry for url from both tiers"""
+        with self._lock:
+            self._memory.pop(url, None)
+        if self.cache_dir:
+            try:
+                os.remove(self._disk_path(url))
+            except OSError:
+                pass
+
+    def _store(self, url: str, entry: Dict) -> None:
+        """Write an entry to both tiers"""
+        self._remember(url, entry)
+        if not self.cache_dir:
+            return
+        # Write then rename so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._disk_path(url))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @staticmethod
+    def _expires_at(headers: Mapping) -> float:
+        """Expiry time from Cache-Control max-age, 0 when absent"""
+        cache_control = headers.get("Cache-Control") or ""
+        if "no-cache" in cache_control or "no-store" in cache_control:
+            return 0.0
+        match = re.search(r"max-age=(\d+)", cache_control)
+        return time.time() + int(match.group(1)) if match else 0.0
+
+    @staticmethod
+    def _no_store(headers: Mapping) -> bool:
+        """True if Cache-Control forbids keeping the response"""
+        return "no-store" in (headers.get("Cache-Control") or "")
+
+    @staticmethod
+    def _result(entry: Dict) -> Tuple[Any, Dict[str, str]]:
+        """Copies of an entry's body and links, so callers cannot
+        mutate the cache"""
+        return (copy.deepcopy(entry["body"]),
+                dict(entry.get("links", {})))
+
+    @staticmethod
+    def _links(headers: Mapping) -> Dict[str, str]:
+        """rel -> URL mapping parsed from a Link header"""
+        link_header = headers.get("Link")
+        if not link_header:
+            return {}
+        return {
+            link["rel"]: link["url"]
+            for link in requests.utils.parse_header_links(link_header)
+            if "rel" in link
+        }
+
+    def get_json_with_links(self, url: str) -> Tuple[Any, Dict[str, str]]:
+        """Get JSON and the Link header relations (next, last, ...) of url,
+        using and refreshing the cache. The results are copies: mutating
+        them does not change the cached entry."""
+        entry = self._load(url)
+        if entry is not None and entry["expires_at"] > time.time():
+            self.hits += 1
+            return self._result(entry)
+
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = self.session.get(url, headers=headers,
+                                    timeout=self.timeout)
+
+        if response.status_code == 304 and entry is not None:
+            self.revalidations += 1
+            if self._no_store(response.headers):
+                self._forget(url)
+            else:
+                entry = dict(entry,
+                             expires_at=self._expires_at(response.headers))
+                self._store(url, entry)
+            return self._result(entry)
+
+        self.misses += 1
+        entry = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "expires_at": self._expires_at(response.headers),
+            "links": self._links(response.headers),
+            "body": response.json(),
+        }
+        validated = (entry["etag"] or entry["last_modified"]
+                     or entry["expires_at"])
+        if self._no_store(response.headers):
+            self._forget(url)
+        elif response.status_code == 200 and validated:
+            self._store(url, entry)
+        return self._result(entry)
+
+    def get_json(self, url: str) -> Dict:
+        """Get JSON from url, using and refreshing the cache"""
+        return self.get_json_with_links(url)[0]
+
+    def clear(self) -> None:
+        """Drop every cached entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+        if self.cache_dir and os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+
+_http_client: Optional[CachingHttpClient] = None
+_http_client_lock = threading.Lock()
+
+
+def configure_http_client(**kwargs: Any) -> CachingHttpClient:
+    """Replace the client used by get_json.
+    Accepts the CachingHttpClient parameters, e.g. cache_dir to enable
+    the on-disk tier.
+    """
+    global _http_client
+    with _http_client_lock:
+        _http_client = CachingHttpClient(**kwargs)
+        return _http_client
+
+
+def _get_http_client() -> CachingHttpClient:
+    """Shared client, memory tier only unless configured"""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = CachingHttpClient()
+        return _http_client
+
+
 def get_json(url: str) -> Dict:
     """Get JSON from remote URL.
+    Goes through the shared CachingHttpClient (pooled session, timeout,
+    conditional requests).
+    """
+    return _get_http_client().get_json(url)
+
+
+def get_json_with_links(url: str) -> Tuple[Any, Dict[str, str]]:
+    """Get JSON from remote URL plus its Link header relations.
+    Example
+    -------
+    >>> body, links = get_json_with_links(repos_url)  # doctest: +SKIP
+    >>> links.get("next")  # doctest: +SKIP
+    'https://api.github.com/organizations/1342004/repos?page=2'
     """
-    response = requests.get(url)
-    return response.json()
+    return _get_http_client().get_json_with_links(url)
 
 
 def memoize(fn: Callable) -> Callable:
@@ -73,3 +411,169 @@ def memoize(fn: Callable) -> Callable:
         return getattr(self, attr_name)
 
     return property(memoized)
+
+
+class _MemoEntry:
+    """Per-instance state of a MemoizedProperty."""
+    __slots__ = ("lock", "value", "has_value", "expires", "generation",
+                 "task")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.value = None
+        self.has_value = False
+        self.expires = None
+        self.generation = 0
+        self.task = None
+
+    def fresh(self) -> bool:
+        """True if a value is stored and has not expired"""
+        return self.has_value and (
+            self.expires is None or time.monotonic() < self.expires
+        )
+
+
+class MemoizedProperty:
+    """Thread-safe memoized property, see memoize_safe.
+    Parameters
+    ----------
+    fn: Callable
+        Method computing the value, sync or ``async def``
+    ttl: Optional[float]
+        Seconds a value stays valid, or None to keep it until invalidated
+    """
+
+    def __init__(self, fn: Callable, ttl: Optional[float] = None) -> None:
+        wraps(fn)(self)
+        self.fn = fn
+        self.ttl = ttl
+        self.is_async = asyncio.iscoroutinefunction(fn)
+        self.attr_name = "_memoized_{}".format(fn.__name__)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _entry(self, obj: Any) -> _MemoEntry:
+        """Return the entry of obj, creating it once"""
+        entry = obj.__dict__.get(self.attr_name)
+        if entry is None:
+            with self._lock:
+                entry = obj.__dict__.setdefault(self.attr_name, _MemoEntry())
+        return entry
+
+    def _count(self, hit: bool) -> None:
+        """Update the hit/miss counters"""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _store(self, entry: _MemoEntry, generation: int, value: Any) -> None:
+        """Keep value unless the entry was invalidated meanwhile"""
+        if entry.generation != generation:
+            return
+        entry.value = value
+        entry.has_value = True
+        entry.expires = (
+            None if self.ttl is None else time.monotonic() + self.ttl
+        )
+
+    def __get__(self, obj: Any, objtype: type = None) -> Any:
+        if obj is None:
+            return self
+        if self.is_async:
+            return self._get_async(obj)
+
+        entry = self._entry(obj)
+        if entry.fresh():
+            self._count(True)
+            return entry.value
+        with entry.lock:
+            # Another thread may have computed it while we waited
+            if entry.fresh():
+                self._count(True)
+                return entry.value
+            self._count(False)
+            generation = entry.generation
+            value = self.fn(obj)
+            self._store(entry, generation, value)
+            return value
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        raise AttributeError("can't set memoized attribute")
+
+    async def _get_async(self, obj: Any) -> Any:
+        """Await the value, sharing one in-flight computation"""
+        entry = self._entry(obj)
+        if entry.fresh():
+            self._count(True)
+            return entry.value
+        if entry.task is not None and not entry.task.done():
+            self._count(True)
+            return await asyncio.shield(entry.task)
+
+        self._count(False)
+        generation = entry.generation
+
+        async def compute():
+            try:
+                value = await self.fn(obj)
+                self._store(entry, generation, value)
+                return value
+            finally:
+                if entry.generation == generation:
+                    entry.task = None
+
+        task = entry.task = asyncio.ensure_future(compute())
+        # Shielded so a cancelled caller does not cancel the shared task
+        return await asyncio.shield(task)
+
+    def invalidate(self, obj: Any) -> None:
+        """Drop the value stored on obj; the next access recomputes it"""
+        entry = obj.__dict__.get(self.attr_name)
+        if entry is not None:
+            entry.generation += 1
+            entry.has_value = False
+            entry.value = None
+            entry.task = None
+
+    def stats(self) -> Dict[str, int]:
+        """Hit and miss counters of this method across instances"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def reset_stats(self) -> None:
+        """Reset the hit and miss counters"""
+        with self._lock:
+            self.hits = self.misses = 0
+
+
+def memoize_safe(fn: Callable = None, *,
+                 ttl: Optional[float] = None) -> Any:
+    """Thread-safe variant of memoize.
+    Concurrent first accesses on one instance run the method only once
+    (single flight), the others wait for and share its result. Values
+    expire after ``ttl`` seconds when given, and can be dropped with
+    ``Class.method.invalidate(instance)``. ``Class.method.stats()`` reports
+    hits and misses. For ``async def`` methods the property returns an
+    awaitable and concurrent awaits share one task.
+    Example
+    -------
+    class MyClass:
+        @memoize_safe(ttl=60)
+        def a_method(self):
+            print("a_method called")
+            return 42
+    >>> my_object = MyClass()
+    >>> my_object.a_method
+    a_method called
+    42
+    >>> my_object.a_method
+    42
+    >>> MyClass.a_method.stats()
+    {'hits': 1, 'misses': 1}
+    """
+    if fn is None:
+        return lambda func: MemoizedProperty(func, ttl=ttl)
+    return MemoizedProperty(fn, ttl=ttl)
@@ -1,18 +1,28 @@
 from rest_framework.response import Response
 from rest_framework import status
-from collections import defaultdict, deque
 from datetime import datetime
 from django.conf import settings
+from django.http import JsonResponse
 import os
 
+from shared_middleware.log_writer import get_writer
+from shared_middleware.ratelimit import get_rate_limiter
+
 
 base_dir = settings.BASE_DIR
 filename = 'requests.log'
 msg_by_ip = []
 
+# Options for the queued writer, e.g. {'policy': 'block'}
+# (see shared_middleware.log_writer.QueuedLogWriter); rotate externally
+log_options = getattr(settings, 'REQUEST_LOG_OPTIONS', {})
+
+def request_log_writer():
+    return get_writer(os.path.join(base_dir, filename), **log_options)
+
 def log_request(entry):
-    with open(os.path.join(base_dir, filename), 'a') as f:
-        f.write(entry)
+    # Queued; written to disk by the writer thread, off the request path
+    request_log_writer().write(entry)
 
 def get_client_ip(request):
     xff = request.META.get("HTTP_X_FORWARDED_FOR")
@@ -23,13 +33,14 @@ def get_client_ip(request):
 class RequestLoggingMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
+        self.log_writer = request_log_writer()
 
     def __call__(self, request):
         user = request.user
         log = f"{datetime.now()} - User: {user} - Path: {request.path}" + "\n"
 
-        # log into request.log
-        log_request(log)
+        # log into request.log (queued, see log_writer)
+        self.log_writer.write(log)
 
         response = self.get_response(request)
 
@@ -52,20 +63,18 @@ class RestrictAccessByTimeMiddleware:
 class OffensiveLanguageMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
-        self.messages_sent = defaultdict(lambda: deque())
-        self.limit = 5 # requests
-        self.window = 60 # seconds
+        # Counters live in the Django cache, shared by all worker processes
+        # (backend and limits: settings.RATE_LIMIT, see ratelimit.py)
+        self.rate_limiter = get_rate_limiter(limit=5, window=60)
 
     def __call__(self, request):
         key = get_client_ip(request)
-        now = datetime.now()
-        q = self.messages_sent[key]
-
-        while q and q[0] <= now - self.window:
-            q.popleft()
-        if len(q) >= self.limit:
-            return Response({"error":"rate limit exceeded"}, status=status.HTTP_429_TOO_MANY_REQUESTS)
-        q.append(now)
+        result = self.rate_limiter.hit(key)
+        if not result.allowed:
+            response = JsonResponse({"error": "rate limit exceeded"},
+                                    status=status.HTTP_429_TOO_MANY_REQUESTS)
+            response['Retry-After'] = str(result.retry_after)
+            return response
         return self.get_response(request)
 
 
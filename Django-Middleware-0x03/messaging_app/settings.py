@@ -14,10 +14,16 @@ from pathlib import Path
 from dotenv import load_dotenv
 from datetime import timedelta
 import os
+import sys
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Repository root, for the middleware support package shared with the other
+# messaging project (shared_middleware)
+if str(BASE_DIR.parent) not in sys.path:
+    sys.path.append(str(BASE_DIR.parent))
+
 load_dotenv(BASE_DIR / '.env')
 
 # Quick-start development settings - unsuitable for production
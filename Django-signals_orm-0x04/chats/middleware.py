@@ -1,9 +1,15 @@
+import json
 import logging
+import re
 from datetime import datetime
 from django.http import HttpResponseForbidden
-from collections import defaultdict
 from django.http import JsonResponse
 from django.contrib.auth.models import AnonymousUser
+from django.conf import settings
+
+from shared_middleware.log_writer import get_writer
+from shared_middleware.ratelimit import describe_window, get_rate_limiter
+
 
 class RequestLoggingMiddleware:
     def __init__(self, get_response):
@@ -13,6 +19,14 @@ class RequestLoggingMiddleware:
         """
         self.get_response = get_response
         self.logger = logging.getLogger(__name__)
+        # Lines are queued and written by a background thread so disk
+        # latency stays off the request path (see
+        # shared_middleware.log_writer.QueuedLogWriter for the
+        # REQUEST_LOG_OPTIONS keys); rotate the file externally
+        # (e.g. logrotate), the writer reopens it
+        self.log_writer = get_writer(
+            'requests.log', **getattr(settings, 'REQUEST_LOG_OPTIONS', {})
+        )
         
     def __call__(self, request):
         """
@@ -25,9 +39,8 @@ class RequestLoggingMiddleware:
         # Log request data (timestamp, user, request path)
         log_message = f'{datetime.now()} - User: {user} - Path: {request.path}'
         
-        # Log to the file
-        with open('requests.log', 'a') as log_file:
-            log_file.write(log_message + '\n')
+        # Queue the line for the log file
+        self.log_writer.write(log_message + '\n')
         
         # Ensure the request continues to the next middleware/view
         response = self.get_response(request)
@@ -71,13 +84,15 @@ class OffensiveLanguageMiddleware:
         Args:
             get_response: The next middleware or view in the chain
         """
-        self.get_reponse = get_response
-        self.ip_requests = defaultdict(deque)
-        
-        # Configuration
-        self.max_requests = 5  # Maximum requests allowed
-        self.time_window = 60  # Time window in seconds (1 minute)  
-        
+        self.get_response = get_response
+
+        # Configuration: 5 requests per 60 seconds unless settings.RATE_LIMIT
+        # says otherwise. Request counts are kept in the Django cache so the
+        # limit holds across worker processes and idle IPs expire on their own.
+        self.rate_limiter = get_rate_limiter(limit=5, window=60)
+        self.max_requests = self.rate_limiter.limit  # Maximum requests allowed
+        self.time_window = self.rate_limiter.window  # Time window in seconds
+
     def __call__(self, request):
         """
         Track POST requests by IP address and enforce rate limits.
@@ -86,30 +101,30 @@ class OffensiveLanguageMiddleware:
             request: The HTTP request object
             
         Returns:
-            HTTP 429 Too Many Requests if limit exceeded,
-            otherwise continues with normal response
+            HTTP 429 Too Many Requests with a Retry-After header if limit
+            exceeded, otherwise continues with normal response
         """
         # Only apply rate limiting to POST requests (message sending)
         if request.method == 'POST':
             # Get client ip address
             ip_address = self.get_client_ip(request)
-            current_time = time.time()
-            
-            # Clean old requests outside the time window
-            self.cleanup_old_requests(ip_address, current_time)
-            
-            # Check if user has exceeded the rate limit
-            if len(self.ip_requests[ip_address]) >= self.max_requests:
+
+            # Count the request, unless the client is over the limit
+            result = self.rate_limiter.hit(ip_address)
+            if not result.allowed:
+                time_window = describe_window(self.time_window)
                 error_message = {
                     "error": "Rate limit exceeded",
-                    "message": f"You have exceeded the maximum of {self.max_requests} messages per minute. Please wait before sending more messages.",
-                    "limit": self.max_requests,
-                    "time_window": "1 minute",
-                    "retry_after": self.time_window
-                }  
-                return JsonResponse(error_message, status=429)
-        # Add current request timestamp
-        self.ip_requests[ip_address].append(current_time)
+                    "message": f"You have exceeded the maximum of {result.limit} messages per {time_window}. Please wait before sending more messages.",
+                    "limit": result.limit,
+                    "time_window": time_window,
+                    "retry_after": result.retry_after
+                }
+                response = JsonResponse(error_message, status=429)
+                response['Retry-After'] = str(result.retry_after)
+                return response
+
+        return self.get_response(request)
     
     def get_client_ip(self, request):
         """
@@ -131,21 +146,7 @@ class OffensiveLanguageMiddleware:
             # Fall back to REMOTE_ADDR
             ip = request.META.get('REMOTE_ADDR')
             
-        return ip 
-    
-    def cleanup_old_requests(self, ip_address, current_time):
-        """
-        Remove timestamps that are outside the time window.
-        
-        Args:
-            ip_address (str): Client IP address
-            current_time (float): Current timestamp in seconds
-        """
-        cutoff_time = current_time - self.time_window
-        
-        # Remove old timestamps
-        while self.ip_requests[ip_address] and self.ip_requests[ip_address][0] < cutoff_time:
-            self.ip_requests[ip_address].popleft()  
+        return ip
 
 
 class RolepermissionMiddleware:
@@ -153,13 +154,27 @@ class RolepermissionMiddleware:
     Middleware that checks the user's role (admin or moderator) before allowing access.
     Returns 403 Forbidden if the user is not admin or moderator.
     """
+
+    # Paths accessible without role checking (prefix match).
+    # Modify this list based on your application needs.
+    public_paths = [
+        '/login/',
+        '/register/',
+        '/logout/',
+        '/admin/login/',
+        '/accounts/login/',
+    ]
     
     def __init__(self, get_response):
         """
         Initialize the middleware with the get_response callable.
         This is called once when the web server starts.
+        The public path prefixes are compiled into one regex here.
         """
         self.get_response = get_response
+        self.public_path_re = re.compile(
+            '|'.join(re.escape(path) for path in self.public_paths)
+        ) if self.public_paths else None
 
     def __call__(self, request):
         """
@@ -202,41 +217,16 @@ class RolepermissionMiddleware:
     
     def _get_user_role(self, user):
         """
-        Extract user role from user object.
-        Modify this method based on how roles are stored in your system.
+        Return the user's role. chats.User stores it in a non-null `role`
+        field that is loaded with the user, so no query is needed.
         """
-        # Option 1: If role is stored as user attribute
-        if hasattr(user, 'role'):
-            return user.role
-        
-        # Option 2: If using user groups (admin or moderator)
-        if user.groups.filter(name__in=['admin', 'moderator']).exists():
-            return user.groups.filter(name__in=['admin', 'moderator']).first().name.lower()
-        
-        # Option 3: If using user profile with role field
-        if hasattr(user, 'profile') and hasattr(user.profile, 'role'):
-            return user.profile.role
-        
-        # Option 4: Check if user is Django superuser
-        if user.is_superuser:
-            return 'admin'
-        
-        # Default: return regular user role
-        return 'user'
+        return user.role
     
     def _is_public_view(self, request):
         """
-        Define which views should be accessible without role checking.
-        Modify this list based on your application needs.
+        Define which views should be accessible without role checking
+        (see public_paths).
         """
-        public_paths = [
-            '/login/',
-            '/register/',
-            '/logout/',
-            '/admin/login/',
-            '/accounts/login/',
-        ]
-        
-        # Check if current path is in public paths
-        return any(request.path.startswith(path) for path in public_paths)            
-                                 
\ No newline at end of file
+        # Check if current path starts with one of the public paths
+        return (self.public_path_re is not None
+                and self.public_path_re.match(request.path) is not None)
@@ -2,29 +2,144 @@
 """
 Task 0: Custom class-based context manager for Database connection.
 Opens a SQLite database connection on entry and closes it on exit.
+
+Read-only work can be routed to `file:...?mode=ro` connections with
+PRAGMA query_only, which never take SQLite's write lock. Writers can opt
+in to one shared writer connection per database file (in WAL mode),
+serialized by a lock, so concurrent readers no longer collide with
+writers and writers no longer fight each other for the lock.
 """
 
+import atexit
+import os
 import sqlite3
+import threading
+from urllib.request import pathname2url
+
+
+class _Writer:
+    """The single shared writer connection for one database file."""
+
+    def __init__(self, db_name: str, wal_autocheckpoint: int):
+        self.conn = sqlite3.connect(db_name, check_same_thread=False)
+        if db_name != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(f"PRAGMA wal_autocheckpoint={int(wal_autocheckpoint)}")
+        self.lock = threading.RLock()
+        self.depth = 0
+        self.writes = 0
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def _writer_for(db_name: str, wal_autocheckpoint: int) -> _Writer:
+    """Returns the shared writer for `db_name`, opening it on first use."""
+    key = db_name if db_name == ":memory:" else os.path.abspath(db_name)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = _writers[key] = _Writer(db_name, wal_autocheckpoint)
+        return writer
+
+
+@atexit.register
+def close_writers(truncate_wal: bool = True):
+    """
+    Closes every shared writer connection, e.g. at application shutdown.
+    With truncate_wal, the WAL is fully checkpointed and truncated first.
+    """
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        with writer.lock:
+            if truncate_wal:
+                writer.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            writer.conn.close()
 
 
 class DatabaseConnection:
     """
     Context manager that opens a SQLite database connection and
     ensures it is closed automatically, even if an exception occurs.
+
+    DatabaseConnection(db) opens a connection of its own, as before.
+    DatabaseConnection(db, read_only=True) yields a fresh read-only
+    connection. DatabaseConnection(db, writer=True) yields the shared
+    writer connection while holding its lock (waiting at most
+    `lock_timeout` seconds for it); changes must still be committed
+    explicitly, and anything left uncommitted is rolled back on exit just
+    as closing a connection would. Opening the shared writer switches the
+    database file to WAL mode; the writers are closed at exit (or by
+    close_writers()).
+
+    Checkpoint policy: SQLite auto-checkpoints once the WAL reaches
+    `wal_autocheckpoint` pages, and a PASSIVE checkpoint (which never
+    blocks readers) runs after every `checkpoint_interval` write
+    contexts that changed the database.
     """
 
-    def __init__(self, db_name: str):
+    wal_autocheckpoint = 1000
+    checkpoint_interval = 100
+
+    def __init__(self, db_name: str, read_only: bool = False,
+                 writer: bool = False, lock_timeout: float = 30.0):
+        if read_only and writer:
+            raise ValueError("read_only and writer are mutually exclusive")
+        if read_only and db_name == ":memory:":
+            raise ValueError("An in-memory database cannot be opened read-only")
         self.db_name = db_name
+        self.read_only = read_only
+        self.writer = writer
+        self.lock_timeout = lock_timeout
         self.conn = None
+        self._writer = None
+        self._changes_before = 0
 
     def __enter__(self):
         """Open the database connection and return it."""
-        self.conn = sqlite3.connect(self.db_name)
+        if self.read_only:
+            uri = f"file:{pathname2url(os.path.abspath(self.db_name))}?mode=ro"
+            self.conn = sqlite3.connect(uri, uri=True)
+            self.conn.execute("PRAGMA query_only=ON")
+            return self.conn
+
+        if not self.writer:
+            self.conn = sqlite3.connect(self.db_name)
+            return self.conn
+
+        writer = _writer_for(self.db_name, self.wal_autocheckpoint)
+        if not writer.lock.acquire(timeout=self.lock_timeout):
+            raise TimeoutError(
+                f"Shared writer for {self.db_name} busy for {self.lock_timeout}s"
+            )
+        self._writer = writer
+        self._writer.depth += 1
+        self.conn = self._writer.conn
+        self._changes_before = self.conn.total_changes
         return self.conn
 
     def __exit__(self, exc_type, exc_value, traceback):
         """Close the connection, rolling back if an exception occurred."""
-        if self.conn:
+        if self._writer is not None:
+            writer = self._writer
+            try:
+                writer.depth -= 1
+                if writer.depth == 0:
+                    # Uncommitted changes are discarded, as closing would do
+                    if self.conn.in_transaction:
+                        self.conn.rollback()
+                    if self.conn.total_changes != self._changes_before:
+                        writer.writes += 1
+                        if writer.writes % self.checkpoint_interval == 0:
+                            self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            finally:
+                self._writer = None
+                self.conn = None
+                writer.lock.release()
+        elif self.conn:
             if exc_type:
                 # Roll back any uncommitted changes if an error occurs
                 self.conn.rollback()
@@ -35,11 +150,11 @@ class DatabaseConnection:
 
 if __name__ == "__main__":
     # Example usage: fetch all rows from users table
-    with DatabaseConnection("users.db") as conn:
+    with DatabaseConnection("users.db", read_only=True) as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM users")
         results = cursor.fetchall()
         for row in results:
             print(row)
     print("Database connection closed successfully.")
-    # Connection is automatically closed here
\ No newline at end of file
+    # Connection is automatically closed here
@@ -7,6 +7,11 @@ A custom context manager ExecuteQuery that:
 - executes a provided SQL query with parameters,
 - returns the results,
 - and ensures the connection closes automatically.
+
+With stream=True the rows are not fetched up front: the `with` body gets
+an iterator that pulls `chunk_size` rows at a time with fetchmany, so
+memory stays bounded by the chunk size. Leaving the block (even early)
+closes the cursor right away.
 """
 
 import sqlite3
@@ -19,12 +24,27 @@ class ExecuteQuery:
         with ExecuteQuery("users.db", "SELECT * FROM users WHERE age > ?", (25,)) as rows:
             for row in rows:
                 print(row)
+
+        # Streaming: rows are fetched in chunks while the block runs
+        with ExecuteQuery("users.db", "SELECT * FROM users", stream=True) as rows:
+            for row in rows:
+                print(row)
+
+    max_rows, when given, raises ValueError as soon as the query produces
+    more rows than allowed, in both modes.
     """
 
-    def __init__(self, db_name: str, query: str, params: tuple = ()):
+    def __init__(self, db_name: str, query: str, params: tuple = (),
+                 stream: bool = False, chunk_size: int = 1000,
+                 max_rows: int = None):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
         self.db_name = db_name
         self.query = query
         self.params = params
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.max_rows = max_rows
         self.conn = None
         self.cursor = None
         self.results = None
@@ -32,20 +52,48 @@ class ExecuteQuery:
     def __enter__(self):
         """
         Opens the database connection, executes the query,
-        fetches all results, and returns them.
+        and returns either all results (list) or, in stream mode,
+        an iterator over them.
         """
         self.conn = sqlite3.connect(self.db_name)
         self.cursor = self.conn.cursor()
-        self.cursor.execute(self.query, self.params)
-        self.results = self.cursor.fetchall()
+        self.cursor.arraysize = self.chunk_size
+        try:
+            self.cursor.execute(self.query, self.params)
+            self.results = self._iter_rows()
+            if not self.stream:
+                self.results = list(self.results)
+        except Exception:
+            self.cursor.close()
+            self.conn.close()
+            raise
         return self.results
 
+    def _iter_rows(self):
+        """
+        Yields rows chunk by chunk, enforcing max_rows.
+        """
+        count = 0
+        while True:
+            rows = self.cursor.fetchmany()
+            if not rows:
+                return
+            count += len(rows)
+            if self.max_rows is not None and count > self.max_rows:
+                raise ValueError(
+                    f"Query returned more than {self.max_rows} rows"
+                )
+            yield from rows
+
     def __exit__(self, exc_type, exc_value, traceback):
         """
         Ensures cursor and connection are closed.
         Rolls back if an exception occurred.
         """
         if self.conn:
+            if self.stream and self.results is not None:
+                # Stop a partially consumed stream before closing the cursor
+                self.results.close()
             if exc_type:
                 self.conn.rollback()
             else:
@@ -6,29 +6,51 @@ Use aiosqlite to fetch:
 1. All users
 2. Users older than 40
 concurrently using asyncio.gather.
+
+Queries share an AsyncConnectionPool, so a fan-out of many queries reuses
+at most POOL_SIZE connections (and aiosqlite threads) instead of opening
+one per query.
 """
 
 import asyncio
+from contextlib import asynccontextmanager
+
 import aiosqlite
 
+from async_pool import AsyncConnectionPool
+
 
 DB_NAME = "users.db"
+POOL_SIZE = 4
+
+
+@asynccontextmanager
+async def _connection(pool=None):
+    """
+    Yields a connection from `pool`, or a dedicated one when no pool is given.
+    """
+    if pool is not None:
+        async with pool.connection() as db:
+            yield db
+    else:
+        async with aiosqlite.connect(DB_NAME) as db:
+            yield db
 
 
-async def async_fetch_users():
+async def async_fetch_users(pool=None):
     """
     Fetch all users from the database asynchronously.
     """
-    async with aiosqlite.connect(DB_NAME) as db:
+    async with _connection(pool) as db:
         async with db.execute("SELECT * FROM users") as cursor:
             return await cursor.fetchall()
 
 
-async def async_fetch_older_users():
+async def async_fetch_older_users(pool=None):
     """
     Fetch users older than 40 from the database asynchronously.
     """
-    async with aiosqlite.connect(DB_NAME) as db:
+    async with _connection(pool) as db:
         async with db.execute("SELECT * FROM users WHERE age > 40") as cursor:
             return await cursor.fetchall()
 
@@ -37,10 +59,11 @@ async def fetch_concurrently():
     """
     Run both queries concurrently and display their results.
     """
-    all_users, older_users = await asyncio.gather(
-        async_fetch_users(),
-        async_fetch_older_users()
-    )
+    async with AsyncConnectionPool(DB_NAME, max_size=POOL_SIZE) as pool:
+        all_users, older_users = await asyncio.gather(
+            async_fetch_users(pool),
+            async_fetch_older_users(pool)
+        )
 
     print("=== All Users ===")
     for user in all_users:
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Async connection pool for aiosqlite.
+
+Every aiosqlite connection runs its own background thread, so opening one
+per query in an asyncio.gather fan-out creates as many threads and file
+handles as there are queries. AsyncConnectionPool caps that number:
+- a semaphore bounds how many connections are checked out at once
+- connections are created lazily, only when no idle one is available
+- idle connections are reused most-recently-used first (warm caches) and
+  recycled after `max_uses` checkouts
+- close() waits for checked-out connections to come back, then closes all
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import aiosqlite
+
+
+class AsyncConnectionPool:
+    """
+    Bounded pool of aiosqlite connections.
+
+    Usage:
+        async with AsyncConnectionPool("users.db", max_size=4) as pool:
+            async with pool.connection() as db:
+                async with db.execute("SELECT * FROM users") as cursor:
+                    rows = await cursor.fetchall()
+    """
+
+    def __init__(self, db_name: str, max_size: int = 4, max_uses: int = 1000,
+                 **connect_kwargs):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.db_name = db_name
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self.connect_kwargs = connect_kwargs
+        self._semaphore = asyncio.Semaphore(max_size)
+        self._idle = []  # stack of (connection, uses)
+        self._in_use = 0
+        self._created = 0
+        self._idle_changed = asyncio.Condition()
+        self._closed = False
+
+    @property
+    def size(self) -> int:
+        """Number of open connections, idle or checked out."""
+        return len(self._idle) + self._in_use
+
+    @property
+    def created(self) -> int:
+        """Total number of connections opened over the pool's lifetime."""
+        return self._created
+
+    async def acquire(self):
+        """
+        Checks a connection out, waiting while max_size are in use.
+        Returns a (connection, uses) pair to hand back to release().
+        """
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        await self._semaphore.acquire()
+        try:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+            if self._idle:
+                conn, uses = self._idle.pop()
+            else:
+                conn, uses = await aiosqlite.connect(self.db_name, **self.connect_kwargs), 0
+                self._created += 1
+        except BaseException:
+            self._semaphore.release()
+            raise
+        self._in_use += 1
+        return conn, uses + 1
+
+    async def release(self, entry, discard=False):
+        """
+        Returns a connection. It is closed instead when `discard` is set,
+        when the pool is shutting down, when it reached max_uses, or when
+        rolling it back fails.
+        """
+        conn, uses = entry
+        try:
+            if discard or self._closed or uses >= self.max_uses:
+                await conn.close()
+            else:
+                try:
+                    if conn.in_transaction:
+                        await conn.rollback()
+                except Exception:
+                    await conn.close()
+                else:
+                    self._idle.append((conn, uses))
+        finally:
+            self._in_use -= 1
+            self._semaphore.release()
+            async with self._idle_changed:
+                self._idle_changed.notify_all()
+
+    @asynccontextmanager
+    async def connection(self):
+        """Async context manager yielding a pooled connection."""
+        entry = await self.acquire()
+        try:
+            yield entry[0]
+        finally:
+            await self.release(entry)
+
+    async def close(self):
+        """
+        Stops handing out connections, waits for checked-out ones to be
+        released, then closes every connection.
+        """
+        self._closed = True
+        async with self._idle_changed:
+            await self._idle_changed.wait_for(lambda: self._in_use == 0)
+        idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            await conn.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+        return False
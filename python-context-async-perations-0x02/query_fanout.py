@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Concurrent query fan-out with per-query deadlines.
+
+Runs N parameterized queries concurrently with a bound on in-flight work
+and returns one QueryResult per query. A query's deadline counts from
+when it is submitted, so time spent waiting for a slot or a connection
+is included. A query that misses it is interrupted (sqlite3 interrupt)
+and reported with timed_out=True, so callers always get the partial
+results of the queries that finished.
+
+Two execution paths share the same Query/QueryResult types:
+- fan_out / iter_completed: asyncio + aiosqlite, optionally through an
+  AsyncConnectionPool
+- fan_out_threaded: a thread pool over read-only DatabaseConnection
+  contexts, for code that is not running an event loop
+"""
+
+import asyncio
+import heapq
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional
+
+import aiosqlite
+
+DatabaseConnection = __import__('0-databaseconnection').DatabaseConnection
+
+
+class Query(NamedTuple):
+    """A query to fan out; `deadline` is in seconds (None: no limit)."""
+    sql: str
+    params: tuple = ()
+    deadline: Optional[float] = None
+
+
+class QueryResult(NamedTuple):
+    """Outcome of one Query. `index` is its position in the input."""
+    index: int
+    query: Query
+    rows: Optional[list] = None
+    error: Optional[BaseException] = None
+    timed_out: bool = False
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """True if the query finished and returned rows."""
+        return self.error is None and not self.timed_out
+
+
+def _as_query(query) -> Query:
+    """Accepts a Query, an SQL string or an (sql, params[, deadline]) tuple."""
+    if isinstance(query, Query):
+        return query
+    if isinstance(query, str):
+        return Query(query)
+    return Query(*query)
+
+
+# Seconds between interrupts while a timed-out connection is closing
+_INTERRUPT_INTERVAL = 0.05
+
+
+async def _checkout(db_name, pool):
+    """
+    Returns a pool entry (connection, uses), or (connection, None) for a
+    dedicated connection when there is no pool.
+    """
+    if pool is not None:
+        return await pool.acquire()
+    return await aiosqlite.connect(db_name), None
+
+
+async def _checkin(entry, pool, discard=False):
+    """Hands a connection from _checkout back to the pool, or closes it."""
+    if pool is not None:
+        await pool.release(entry, discard=discard)
+    else:
+        await entry[0].close()
+
+
+async def _discard(entry, pool):
+    """
+    Closes the connection of a timed-out query instead of reusing it.
+
+    aiosqlite runs a connection's calls in order, so the close only
+    completes once the abandoned execute has returned. That execute may
+    not have started when the deadline passed, so it is interrupted
+    repeatedly until the close goes through.
+    """
+    db = entry[0]
+    closing = asyncio.ensure_future(_checkin(entry, pool, discard=True))
+    while not closing.done():
+        try:
+            await db.interrupt()
+        except ValueError:  # the connection has just been closed
+            pass
+        await asyncio.wait({closing}, timeout=_INTERRUPT_INTERVAL)
+    try:
+        await closing
+    except Exception:
+        pass  # the connection is abandoned either way
+
+
+async def _run_async(index, query, db_name, pool, semaphore, deadline_at):
+    """
+    Executes one query under the in-flight limit. `deadline_at` (event loop
+    time fixed at submission, None: no limit) bounds the wait for a slot
+    and a connection as well as the execution.
+    """
+    start = time.perf_counter()
+    held = []  # the checked-out entry, once there is one
+
+    async def attempt():
+        async with semaphore:
+            held.append(await _checkout(db_name, pool))
+            async with held[0][0].execute(query.sql, query.params) as cursor:
+                return await cursor.fetchall()
+
+    timeout = None
+    if deadline_at is not None:
+        timeout = max(0.0, deadline_at - asyncio.get_running_loop().time())
+    try:
+        rows = await asyncio.wait_for(attempt(), timeout)
+    except asyncio.TimeoutError:
+        if held:
+            await _discard(held[0], pool)
+        return QueryResult(index, query, timed_out=True,
+                           elapsed=time.perf_counter() - start)
+    except asyncio.CancelledError:
+        # Abandoned by the consumer, e.g. iter_completed closed early
+        if held:
+            await _discard(held[0], pool)
+        raise
+    except Exception as exc:
+        if held:
+            await _checkin(held[0], pool)
+        return QueryResult(index, query, error=exc,
+                           elapsed=time.perf_counter() - start)
+    await _checkin(held[0], pool)
+    return QueryResult(index, query, rows=rows,
+                       elapsed=time.perf_counter() - start)
+
+
+async def iter_completed(queries: Iterable, db_name: str = "users.db",
+                         pool=None, max_in_flight: int = 8,
+                         default_deadline: Optional[float] = None):
+    """
+    Async generator yielding a QueryResult as soon as each query finishes.
+
+    Args:
+        queries: Query objects, SQL strings or (sql, params[, deadline]) tuples
+        db_name: database used when no pool is given
+        pool: optional AsyncConnectionPool to draw connections from
+        max_in_flight: maximum number of queries executing at once
+        default_deadline: deadline for queries that do not set one
+
+    Deadlines count from submission, including time queued behind
+    max_in_flight or waiting for a pooled connection.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max_in_flight)
+    tasks = []
+    for index, query in enumerate(queries):
+        query = _as_query(query)
+        if query.deadline is None and default_deadline is not None:
+            query = query._replace(deadline=default_deadline)
+        deadline_at = None
+        if query.deadline is not None:
+            deadline_at = loop.time() + query.deadline
+        tasks.append(asyncio.ensure_future(
+            _run_async(index, query, db_name, pool, semaphore, deadline_at)
+        ))
+
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Let the cancelled queries hand their connections back
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def fan_out(queries: Iterable, db_name: str = "users.db", pool=None,
+                  max_in_flight: int = 8,
+                  default_deadline: Optional[float] = None) -> List[QueryResult]:
+    """
+    Runs every query concurrently and returns the results in input order.
+
+    Takes the same arguments as iter_completed.
+    """
+    results = [result async for result in iter_completed(
+        queries, db_name, pool, max_in_flight, default_deadline
+    )]
+    return sorted(results, key=lambda result: result.index)
+
+
+def _run_threaded(index, query, db_name, deadline_at):
+    """
+    Executes one query on its own DatabaseConnection. `deadline_at`
+    (time.monotonic() value fixed at submission, None: no limit) also
+    covers the time spent waiting for a worker thread.
+    """
+    start = time.perf_counter()
+    timed_out = threading.Event()
+    remaining = None
+    if deadline_at is not None:
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            return QueryResult(index, query, timed_out=True, elapsed=0.0)
+    try:
+        with DatabaseConnection(db_name, read_only=True) as conn:
+            timer = None
+            if remaining is not None:
+                def interrupt():
+                    timed_out.set()
+                    conn.interrupt()
+                timer = threading.Timer(remaining, interrupt)
+                timer.start()
+            try:
+                rows = conn.execute(query.sql, query.params).fetchall()
+            finally:
+                if timer is not None:
+                    timer.cancel()
+    except sqlite3.OperationalError as exc:
+        if timed_out.is_set():
+            return QueryResult(index, query, timed_out=True,
+                               elapsed=time.perf_counter() - start)
+        return QueryResult(index, query, error=exc, elapsed=time.perf_counter() - start)
+    except Exception as exc:
+        return QueryResult(index, query, error=exc, elapsed=time.perf_counter() - start)
+    return QueryResult(index, query, rows=rows, elapsed=time.perf_counter() - start)
+
+
+def fan_out_threaded(queries: Iterable, db_name: str = "users.db",
+                     max_in_flight: int = 8,
+                     default_deadline: Optional[float] = None) -> List[QueryResult]:
+    """
+    Thread-pool fallback of fan_out using the sync DatabaseConnection.
+
+    Each query gets its own read-only connection; at most max_in_flight
+    run at once. As in iter_completed, deadlines count from submission.
+    Results are returned in input order.
+    """
+    prepared = []
+    for query in queries:
+        query = _as_query(query)
+        if query.deadline is None and default_deadline is not None:
+            query = query._replace(deadline=default_deadline)
+        prepared.append(query)
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        futures = []
+        for index, query in enumerate(prepared):
+            deadline_at = None
+            if query.deadline is not None:
+                deadline_at = time.monotonic() + query.deadline
+            futures.append(executor.submit(_run_threaded, index, query,
+                                           db_name, deadline_at))
+        return [future.result() for future in futures]
+
+
+def merge_rows(results: Iterable[QueryResult],
+               key: Optional[Callable[[Any], Any]] = None):
+    """
+    Lazily combines the rows of successful results.
+
+    Without `key` the rows are chained in result order. With `key` each
+    result's rows must already be sorted by it (e.g. via ORDER BY) and
+    are k-way merged into one sorted stream without re-sorting.
+    """
+    row_lists = [result.rows for result in results if result.ok]
+    if key is None:
+        return (row for rows in row_lists for row in rows)
+    return heapq.merge(*row_lists, key=key)
+
+
+if __name__ == "__main__":
+    demo_queries = [
+        Query("SELECT * FROM users WHERE age > ? ORDER BY id", (40,)),
+        Query("SELECT * FROM users WHERE age <= ? ORDER BY id", (40,)),
+        Query("SELECT COUNT(*) FROM users", deadline=1.0),
+    ]
+
+    for result in asyncio.run(fan_out(demo_queries)):
+        status = "ok" if result.ok else ("timed out" if result.timed_out else result.error)
+        print(f"[{result.index}] {result.query.sql!r}: {status} in {result.elapsed * 1000:.1f} ms")
+
+    merged = merge_rows(fan_out_threaded(demo_queries[:2]), key=lambda row: row[0])
+    print("First merged rows:", list(merged)[:5])
@@ -3,31 +3,138 @@
 Task 0: Logging database Queries
 Create a decorator `log_queries` that logs the SQL query
 executed by any decorated function.
+
+Sampled calls are timed and recorded per query fingerprint in
+query_profiler.registry (p50/p95/p99, rows returned), and logged as
+structured JSON through the "query_log" logger. The first call of a
+fingerprint slower than `slow_ms` captures its EXPLAIN QUERY PLAN, which
+is then reused for every later slow call of that fingerprint.
 """
 
+import os
 import sqlite3
 import functools
+import json
+import logging
+import random
+import time
 from datetime import datetime
+from urllib.request import pathname2url
+
+from query_profiler import PLAN_UNAVAILABLE, explain_query_plan, fingerprint, registry
+
+logger = logging.getLogger("query_log")
 
 
-def log_queries(func):
+def log_queries(func=None, *, sample_rate=1.0, slow_ms=100.0, db_path="users.db"):
     """
-    Decorator that logs the SQL query before executing the wrapped function.
+    Decorator that logs and profiles the SQL query of the wrapped function.
     Assumes the decorated function receives the SQL query as a `query`
-    keyword argument or as the first positional argument.
+    keyword argument or as the first positional argument (after the
+    connection, if it takes one), and optional parameters as `params`.
+
+    Can be used bare (`@log_queries`) or with options:
+        sample_rate: fraction of calls that are timed and logged (0.0-1.0);
+                     unsampled calls go straight to the wrapped function
+        slow_ms: calls slower than this log the query plan, captured with
+                 EXPLAIN QUERY PLAN once per fingerprint
+        db_path: database opened read-only for EXPLAIN when the wrapped
+                 function does not receive a connection; if it does not
+                 exist no plan is captured
     """
+    if func is None:
+        return functools.partial(
+            log_queries, sample_rate=sample_rate, slow_ms=slow_ms, db_path=db_path
+        )
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        # Determine the query string
+        if sample_rate < 1.0 and random.random() >= sample_rate:
+            return func(*args, **kwargs)
+
+        # Determine the query string and the connection, if one was passed
+        positional = list(args)
+        conn = None
+        if positional and isinstance(positional[0], sqlite3.Connection):
+            conn = positional.pop(0)
         query = kwargs.get("query")
-        if query is None and args:
-            query = args[0]
-        print(f"[LOG] Executing SQL Query: {query}")
-        return func(*args, **kwargs)
+        if query is None and positional:
+            query = positional[0]
+        params = kwargs.get("params")
+        if params is None:
+            params = positional[1] if len(positional) > 1 else ()
+
+        start = time.perf_counter()
+        status = "ok"
+        result = None
+        try:
+            result = func(*args, **kwargs)
+            return result
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            _record(query, params, conn, duration_ms, result, status, slow_ms, db_path)
 
     return wrapper
 
 
+def _record(query, params, conn, duration_ms, result, status, slow_ms, db_path):
+    """Stores one timed call in the registry and emits its JSON log line."""
+    if query is None:
+        return
+
+    fp = fingerprint(query)
+    rows = len(result) if isinstance(result, list) else None
+    slow = duration_ms >= slow_ms
+    plan = None
+    new_plan = None
+    if slow:
+        plan = registry.plan(fp)
+        if plan is None:
+            plan = _explain(query, params, conn, db_path)
+            # Keep only real plans so a failed EXPLAIN is retried later
+            failed = bool(plan) and plan[0].startswith(PLAN_UNAVAILABLE)
+            if plan is not None and not failed:
+                new_plan = plan
+
+    registry.record(fp, duration_ms, rows, slow, new_plan)
+
+    entry = {
+        "event": "query",
+        "timestamp": datetime.now().isoformat(),
+        "fingerprint": fp,
+        "duration_ms": round(duration_ms, 3),
+        "rows": rows,
+        "status": status,
+    }
+    if slow:
+        entry["slow"] = True
+        entry["plan"] = plan
+    logger.info(json.dumps(entry))
+
+
+def _explain(query, params, conn, db_path):
+    """
+    Captures the query plan on `conn`, or on a read-only connection to
+    `db_path` (never created if missing). Returns None if neither works.
+    """
+    if conn is not None:
+        return explain_query_plan(conn, query, params)
+    if not os.path.exists(db_path):
+        return None
+    uri = f"file:{pathname2url(os.path.abspath(db_path))}?mode=ro"
+    try:
+        explain_conn = sqlite3.connect(uri, uri=True)
+    except sqlite3.Error:
+        return None
+    try:
+        return explain_query_plan(explain_conn, query, params)
+    finally:
+        explain_conn.close()
+
+
 @log_queries
 def fetch_all_users(query):
     """
@@ -42,7 +149,11 @@ def fetch_all_users(query):
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     # Example usage
     users = fetch_all_users(query="SELECT * FROM users")
     for user in users:
         print(user)
+
+    print(json.dumps(registry.snapshot(), indent=2))
@@ -1,28 +1,27 @@
 #!/usr/bin/env python3
 """
 Task 1: Handle Database Connections with a Decorator
-Decorator `with_db_connection` automatically opens a database
-connection, passes it to the wrapped function, and closes it afterward.
+Decorator `with_db_connection` automatically provides a database
+connection from the shared pool, passes it to the wrapped function, and
+returns it to the pool afterward.
 """
 
-import sqlite3
 import functools
 
+from connection_pool import get_pool
+
 
 def with_db_connection(func):
     """
-    Opens a SQLite connection to `users.db`, passes it to the
-    decorated function as the first argument, and ensures
-    the connection is closed after the function finishes.
+    Borrows a SQLite connection from the shared pool (see connection_pool),
+    passes it to the decorated function as the first argument, and returns
+    it to the pool afterwards.
     """
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        conn = sqlite3.connect("users.db")
-        try:
+        with get_pool().connection() as conn:
             # Inject the connection as the first positional argument
             return func(conn, *args, **kwargs)
-        finally:
-            conn.close()
 
     return wrapper
 
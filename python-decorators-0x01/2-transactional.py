@@ -3,46 +3,180 @@
 Task 2: Transaction Management Decorator
 Ensures a database operation is executed inside a transaction.
 Commits if successful; rolls back on any exception.
+After a commit, cached query results that read a written table are
+invalidated (see result_cache).
+
+With `transactional(coalesce=True)` concurrent calls are queued for a few
+milliseconds and run together in one transaction (one fsync), each inside
+its own savepoint so a failing call only undoes its own changes.
 """
 
-import sqlite3
 import functools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from connection_pool import get_pool
+from result_cache import invalidate_all, invalidate_tables, track_tables
 
 
 def with_db_connection(func):
     """
-    Opens a SQLite connection to users.db, passes it to the
-    decorated function as the first argument, and ensures
-    the connection is closed afterwards.
+    Borrows a SQLite connection from the shared pool (see connection_pool),
+    passes it to the decorated function as the first argument, and returns
+    it to the pool afterwards.
     """
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        conn = sqlite3.connect("users.db")
-        try:
+        with get_pool().connection() as conn:
             return func(conn, *args, **kwargs)
-        finally:
-            conn.close()
     return wrapper
 
 
-def transactional(func):
+def transactional(func=None, *, coalesce=False, max_wait=0.005, max_batch=100):
     """
     Decorator to wrap a function call inside a database transaction.
     If the wrapped function raises an exception, the transaction is rolled back;
-    otherwise the transaction is committed.
+    otherwise the transaction is committed and cached results reading any
+    table it wrote to are invalidated.
+
+    With coalesce=True the decorated function is called without a
+    connection (do not stack it under with_db_connection): calls are
+    batched by a WriteCoalescer for up to `max_wait` seconds or
+    `max_batch` operations, and each caller gets its own result or
+    exception back.
     """
+    if func is None:
+        return functools.partial(
+            transactional, coalesce=coalesce, max_wait=max_wait, max_batch=max_batch
+        )
+
+    if coalesce:
+        coalescer = WriteCoalescer(func, max_wait=max_wait, max_batch=max_batch)
+
+        @functools.wraps(func)
+        def coalesced(*args, **kwargs):
+            return coalescer.submit(*args, **kwargs).result()
+        coalesced.coalescer = coalescer
+        return coalesced
+
     @functools.wraps(func)
     def wrapper(conn, *args, **kwargs):
         try:
-            result = func(conn, *args, **kwargs)
+            with track_tables(conn) as tables:
+                result = func(conn, *args, **kwargs)
             conn.commit()
-            return result
         except Exception:
             conn.rollback()
             raise
+        _invalidate(tables)
+        return result
     return wrapper
 
 
+def _invalidate(tables):
+    """Invalidates cached results reading what a committed write touched."""
+    if tables.complete:
+        invalidate_tables(tables.written)
+    else:
+        invalidate_all()
+
+
+class WriteCoalescer:
+    """
+    Runs queued calls of `func(conn, *args, **kwargs)` in shared transactions.
+
+    A background thread takes the first queued call, keeps collecting
+    calls until `max_batch` are queued or `max_wait` seconds have passed,
+    and runs them all on one pooled connection in a single transaction.
+    Every call runs inside its own SAVEPOINT: an exception rolls back
+    just that call and is delivered to its caller, the others still
+    commit together.
+    """
+
+    def __init__(self, func, max_wait=0.005, max_batch=100):
+        self.func = func
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self.transactions = 0
+        self.operations = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, *args, **kwargs):
+        """Queues one call and returns a Future for its result."""
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((future, args, kwargs))
+        return future
+
+    def _ensure_worker(self):
+        """Starts the background writer thread on first use."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name=f"coalesce-{self.func.__name__}", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        """Writer thread: collects batches and executes them forever."""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._execute(batch)
+
+    def _execute(self, batch):
+        """Runs one batch in a single transaction and resolves its futures."""
+        batch = [job for job in batch if job[0].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        results = []
+        try:
+            with get_pool().connection() as conn:
+                with track_tables(conn) as tables:
+                    conn.execute("BEGIN")
+                    for future, args, kwargs in batch:
+                        conn.execute("SAVEPOINT coalesced_call")
+                        try:
+                            result = self.func(conn, *args, **kwargs)
+                        except Exception as exc:
+                            conn.execute("ROLLBACK TO coalesced_call")
+                            conn.execute("RELEASE coalesced_call")
+                            future.set_exception(exc)
+                        else:
+                            conn.execute("RELEASE coalesced_call")
+                            results.append((future, result))
+                try:
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+        except Exception as exc:
+            # The shared transaction failed: nothing was committed
+            for future, _, _ in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        self.transactions += 1
+        self.operations += len(batch)
+        _invalidate(tables)
+        for future, result in results:
+            future.set_result(result)
+
+
 @with_db_connection
 @transactional
 def update_user_email(conn, user_id, new_email):
@@ -57,6 +191,18 @@ def update_user_email(conn, user_id, new_email):
     )
 
 
+@transactional(coalesce=True)
+def update_user_email_coalesced(conn, user_id, new_email):
+    """
+    Same as update_user_email, but concurrent calls share transactions.
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        "UPDATE users SET email = ? WHERE id = ?",
+        (new_email, user_id)
+    )
+
+
 if __name__ == "__main__":
     # Update user's email with automatic transaction handling
     update_user_email(user_id=1, new_email="Crawford_Cartwright@hotmail.com")
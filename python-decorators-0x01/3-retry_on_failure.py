@@ -3,48 +3,232 @@
 Task 3: Retry Database Queries
 Implements a decorator `retry_on_failure` to retry database operations
 a specified number of times with a delay if an exception occurs.
+
+Only transient errors (see `is_retryable`) are retried, with exponential
+backoff and jitter between attempts. A per-target circuit breaker fails
+fast once too many consecutive transient failures have been seen.
+Coroutine functions are supported and back off with asyncio.sleep.
 """
 
+import asyncio
+import inspect
+import random
 import time
 import sqlite3
 import functools
+import threading
+
+from connection_pool import get_pool
+
+# Substrings of sqlite3.OperationalError messages worth retrying
+TRANSIENT_ERRORS = (
+    "database is locked",
+    "database table is locked",
+    "database is busy",
+)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the target while its circuit is open."""
+
+
+def is_retryable(exc):
+    """
+    Returns True for transient errors such as lock contention.
+    Programming errors (bad SQL, missing tables, constraint violations)
+    are never retried.
+    """
+    if isinstance(exc, sqlite3.OperationalError):
+        message = str(exc).lower()
+        return any(text in message for text in TRANSIENT_ERRORS)
+    return isinstance(exc, (TimeoutError, ConnectionError))
+
+
+class CircuitBreaker:
+    """
+    Counts consecutive transient failures for one target.
+    After `failure_threshold` failures the circuit opens and calls fail
+    fast; after `reset_timeout` seconds a single trial call is let
+    through (half-open), and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """'closed', 'open' or 'half-open'."""
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now):
+        """Computes the state at time `now`. Caller holds the lock."""
+        if self.opened_at is None:
+            return "closed"
+        if now - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self):
+        """Raises CircuitOpenError if the call must not go through."""
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == "open" or (state == "half-open" and self._trial_running):
+                raise CircuitOpenError("Circuit open: too many recent failures")
+            if state == "half-open":
+                self._trial_running = True
+
+    def record_success(self):
+        """Closes the circuit and resets the failure count."""
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        """Counts a transient failure, opening the circuit at the threshold."""
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    def record_ignored(self):
+        """Releases a half-open trial that ended in a non-transient error."""
+        with self._lock:
+            self._trial_running = False
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(target, failure_threshold=5, reset_timeout=30.0):
+    """
+    Returns the shared circuit breaker for `target`, creating it once.
+    Raises ValueError if it already exists with different settings.
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(target)
+        if breaker is None:
+            breaker = _breakers[target] = CircuitBreaker(failure_threshold, reset_timeout)
+        elif (breaker.failure_threshold, breaker.reset_timeout) != (failure_threshold, reset_timeout):
+            raise ValueError(
+                f"Circuit breaker {target!r} already exists with "
+                f"failure_threshold={breaker.failure_threshold}, "
+                f"reset_timeout={breaker.reset_timeout}"
+            )
+        return breaker
+
+
+def backoff_delay(attempt, delay, backoff=2.0, max_delay=30.0, jitter=True):
+    """
+    Seconds to wait after failed attempt number `attempt` (1-based).
+    Grows as delay * backoff ** (attempt - 1), capped at max_delay. With
+    jitter the wait is drawn uniformly from [0, that value] so that
+    competing workers do not retry in lockstep.
+    """
+    wait = min(max_delay, delay * backoff ** (attempt - 1))
+    if jitter:
+        wait = random.uniform(0, wait)
+    return wait
 
 
 def with_db_connection(func):
     """
-    Opens a SQLite connection to users.db, passes it to the
-    decorated function as the first argument, and ensures
-    the connection is closed afterward.
+    Borrows a SQLite connection from the shared pool (see connection_pool),
+    passes it to the decorated function as the first argument, and returns
+    it to the pool afterwards.
     """
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        conn = sqlite3.connect("users.db")
-        try:
+        with get_pool().connection() as conn:
             return func(conn, *args, **kwargs)
-        finally:
-            conn.close()
     return wrapper
 
 
-def retry_on_failure(retries=3, delay=2):
+def retry_on_failure(retries=3, delay=2, backoff=2.0, max_delay=30.0, jitter=True,
+                     retryable=is_retryable, target=None,
+                     failure_threshold=5, reset_timeout=30.0):
     """
     Decorator factory that retries a database operation up to `retries` times
-    with `delay` seconds between attempts if an exception is raised.
+    if a transient exception is raised. The wait after the first failure is
+    `delay` seconds and grows exponentially after later ones; with jitter
+    each wait is instead drawn uniformly between 0 and that value.
+
+    Args:
+        retries: total number of attempts (at least 1)
+        delay, backoff, max_delay, jitter: see backoff_delay
+        retryable: predicate deciding whether an exception is transient;
+                   other exceptions are re-raised immediately
+        target: circuit breaker name; defaults to the function's qualified
+                name, and functions sharing a target share a breaker
+        failure_threshold, reset_timeout: see CircuitBreaker; pass
+                failure_threshold=None to disable the breaker
     """
+    if retries < 1:
+        raise ValueError("retries must be at least 1")
+
     def decorator(func):
+        breaker = None
+        if failure_threshold is not None:
+            name = target or f"{func.__module__}.{func.__qualname__}"
+            breaker = get_breaker(name, failure_threshold, reset_timeout)
+
+        def attempt_failed(attempt, exc):
+            """Records a failure; returns the wait before retrying, or None."""
+            if not retryable(exc):
+                if breaker:
+                    breaker.record_ignored()
+                return None
+            if breaker:
+                breaker.record_failure()
+            print(f"[Retry {attempt}/{retries}] Error: {exc}")
+            if attempt >= retries:
+                return None
+            return backoff_delay(attempt, delay, backoff, max_delay, jitter)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                for attempt in range(1, retries + 1):
+                    if breaker:
+                        breaker.before_call()
+                    try:
+                        result = await func(*args, **kwargs)
+                    except Exception as e:
+                        wait = attempt_failed(attempt, e)
+                        if wait is None:
+                            raise
+                        await asyncio.sleep(wait)
+                    else:
+                        if breaker:
+                            breaker.record_success()
+                        return result
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            last_exc = None
             for attempt in range(1, retries + 1):
+                if breaker:
+                    breaker.before_call()
                 try:
-                    return func(*args, **kwargs)
+                    result = func(*args, **kwargs)
                 except Exception as e:
-                    last_exc = e
-                    print(f"[Retry {attempt}/{retries}] Error: {e}")
-                    if attempt < retries:
-                        time.sleep(delay)
-            # If all retries fail, re-raise the last exception
-            raise last_exc
+                    wait = attempt_failed(attempt, e)
+                    if wait is None:
+                        # Not retryable, or out of attempts
+                        raise
+                    time.sleep(wait)
+                else:
+                    if breaker:
+                        breaker.record_success()
+                    return result
         return wrapper
     return decorator
 
@@ -2,37 +2,40 @@
 """
 Task 4: Cache Database Queries
 Implements a decorator `cache_query` to cache query results
-based on the SQL query string to avoid redundant database calls.
+based on the SQL query and its parameters to avoid redundant database calls.
+
+Results live in a bounded LRU cache with a TTL (see result_cache). Entries
+are invalidated when a `transactional` write touches a table they read.
 """
 
-import time
-import sqlite3
 import functools
 
-# In-memory cache: {query_string: result}
-query_cache = {}
+from connection_pool import get_pool
+from result_cache import QueryCache, current_generation, make_key, track_tables
+
+# Bounded in-memory cache: {(normalized_sql, params): result}
+query_cache = QueryCache(max_entries=256, ttl=300.0)
 
 
 def with_db_connection(func):
     """
-    Opens a SQLite connection to users.db, passes it to the
-    decorated function as the first argument, and ensures
-    the connection is closed afterwards.
+    Borrows a SQLite connection from the shared pool (see connection_pool),
+    passes it to the decorated function as the first argument, and returns
+    it to the pool afterwards.
     """
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        conn = sqlite3.connect("users.db")
-        try:
+        with get_pool().connection() as conn:
             return func(conn, *args, **kwargs)
-        finally:
-            conn.close()
     return wrapper
 
 
 def cache_query(func):
     """
-    Decorator that caches the results of a database query
-    using the SQL query string as the cache key.
+    Decorator that caches the results of a database query, keyed by the
+    normalized SQL query string and its bound parameters.
+    The query is read from the `query` keyword or the first positional
+    argument, and parameters from `params` or the second positional argument.
     """
     @functools.wraps(func)
     def wrapper(conn, *args, **kwargs):
@@ -40,15 +43,26 @@ def cache_query(func):
         query = kwargs.get("query")
         if query is None and args:
             query = args[0]
+        params = kwargs.get("params")
+        if params is None:
+            params = args[1] if len(args) > 1 else ()
+
+        key = make_key(query, params)
 
         # Check cache
-        if query in query_cache:
+        hit, result = query_cache.get(key)
+        if hit:
             print(f"[CACHE HIT] Returning cached result for query: {query}")
-            return query_cache[query]
+            return result
 
         print(f"[CACHE MISS] Executing and caching result for query: {query}")
-        result = func(conn, *args, **kwargs)
-        query_cache[query] = result
+        # Record the tables the query reads so writes can invalidate it;
+        # a write committed meanwhile makes set() drop the result
+        generation = current_generation()
+        with track_tables(conn) as tables:
+            result = func(conn, *args, **kwargs)
+        if tables.complete:
+            query_cache.set(key, result, tables.read, generation)
         return result
 
     return wrapper
@@ -56,12 +70,12 @@ def cache_query(func):
 
 @with_db_connection
 @cache_query
-def fetch_users_with_cache(conn, query):
+def fetch_users_with_cache(conn, query, params=()):
     """
-    Fetch users from the database, caching results by query string.
+    Fetch users from the database, caching results by query and parameters.
     """
     cursor = conn.cursor()
-    cursor.execute(query)
+    cursor.execute(query, params)
     return cursor.fetchall()
 
 
@@ -73,4 +87,5 @@ if __name__ == "__main__":
     # Second call will use the cached result
     users_again = fetch_users_with_cache(query="SELECT * FROM users")
     print("Second call (from cache):", users_again)
-    assert users == users_again, "Cached result should match the original result"
\ No newline at end of file
+    assert users == users_again, "Cached result should match the original result"
+    print("Cache stats:", query_cache.stats())
\ No newline at end of file
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark: decorated lookups per second with and without pooling.
+
+"unpooled" is the original with_db_connection (sqlite3.connect and close
+on every call); "pooled" draws from connection_pool.ConnectionPool.
+
+Usage:
+    python3 bench_pooling.py [calls_per_thread] [threads ...]
+"""
+
+import functools
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+from connection_pool import ConnectionPool
+
+
+def create_users_db(db_path, rows=1000):
+    """Creates a users table with `rows` rows."""
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, email TEXT, age INTEGER)"
+    )
+    conn.executemany(
+        "INSERT INTO users (name, email, age) VALUES (?, ?, ?)",
+        ((f"user{i}", f"user{i}@example.com", 18 + i % 80) for i in range(rows)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def unpooled(db_path):
+    """The original per-call connection decorator."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            conn = sqlite3.connect(db_path)
+            try:
+                return func(conn, *args, **kwargs)
+            finally:
+                conn.close()
+        return wrapper
+    return decorator
+
+
+def pooled(pool):
+    """A with_db_connection equivalent that draws from `pool`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with pool.connection() as conn:
+                return func(conn, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_user_by_id(conn, user_id):
+    """Fetch a user by their ID from the users table."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+    return cursor.fetchone()
+
+
+def run(fetch, threads, calls):
+    """Runs `calls` lookups in each of `threads` threads; returns calls/sec."""
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        barrier.wait()
+        for i in range(calls):
+            fetch(user_id=i % 1000 + 1)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in workers:
+        t.join()
+    return threads * calls / (time.perf_counter() - start)
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    thread_counts = [int(arg) for arg in sys.argv[2:]] or [1, 8, 32]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "users.db")
+        create_users_db(db_path)
+
+        print(f"calls_per_thread={calls}")
+        print(f"{'threads':>7} {'unpooled/s':>12} {'pooled/s':>12} {'speedup':>8}")
+        for threads in thread_counts:
+            pool = ConnectionPool(db_path, max_size=threads)
+            plain_rate = run(unpooled(db_path)(get_user_by_id), threads, calls)
+            pool_rate = run(pooled(pool)(get_user_by_id), threads, calls)
+            pool.close()
+            print(f"{threads:>7} {plain_rate:>12.0f} {pool_rate:>12.0f} "
+                  f"{pool_rate / plain_rate:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
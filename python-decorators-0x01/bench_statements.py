@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: statement compilation cost across decorated query calls.
+
+Runs the same parameterized lookups three ways:
+- "connect per call": the original with_db_connection (every call
+  opens a connection, so every statement is compiled again)
+- "pooled, no cache": pooled connections with cached_statements=0
+- "pooled, cached": pooled connections reusing compiled statements
+
+It then runs the real decorated functions, `@with_db_connection
+@cache_query` (4-cache_query, forced to miss) and `@with_db_connection
+@transactional` (2-transactional), on the shared pool and reports how
+many of their executions reused a compiled statement and how many cache
+flushes (e.g. set_authorizer calls) were observed.
+
+Usage:
+    python3 bench_statements.py [calls]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from bench_pooling import create_users_db, unpooled, pooled
+from connection_pool import ConnectionPool, configure_pool, get_pool
+from statement_cache import registry
+
+cache_query = __import__('4-cache_query')
+transactional = __import__('2-transactional')
+
+# A query that takes noticeably longer to compile than to run
+QUERY = """
+SELECT u.id, u.name, u.email, u.age,
+       (SELECT COUNT(*) FROM users o WHERE o.age = u.age) AS same_age,
+       CASE WHEN u.age < 30 THEN 'young' WHEN u.age < 60 THEN 'adult' ELSE 'senior' END
+FROM users u
+WHERE u.id = ?
+"""
+
+
+def get_user_report(conn, user_id):
+    """Fetch a user row plus derived columns."""
+    cursor = conn.cursor()
+    cursor.execute(QUERY, (user_id,))
+    return cursor.fetchone()
+
+
+def timed(fetch, calls):
+    """Returns microseconds per call for `calls` sequential lookups."""
+    start = time.perf_counter()
+    for i in range(calls):
+        fetch(user_id=i % 1000 + 1)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def decorated_paths(db_path, calls):
+    """
+    Times the real @cache_query and @transactional paths on the shared
+    pool; returns {name: (us/call, registry stats)}.
+    """
+    configure_pool(db_path, max_size=1)
+    # Every call misses, so each one executes QUERY on a pooled connection
+    cache_query.query_cache.ttl = 0
+    fetch = cache_query.fetch_users_with_cache
+
+    results = {}
+    registry.reset()
+    with contextlib.redirect_stdout(io.StringIO()):
+        micros = timed(lambda user_id: fetch(query=QUERY, params=(user_id,)), calls)
+    results["@cache_query miss"] = (micros, registry.stats())
+
+    registry.reset()
+    micros = timed(
+        lambda user_id: transactional.update_user_email(user_id, f"u{user_id}@example.org"),
+        calls,
+    )
+    results["@transactional"] = (micros, registry.stats())
+    get_pool().close()
+    return results
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "users.db")
+        create_users_db(db_path)
+
+        results = {"connect per call": timed(unpooled(db_path)(get_user_report), calls)}
+
+        no_cache = ConnectionPool(db_path, max_size=1, cached_statements=0)
+        results["pooled, no cache"] = timed(pooled(no_cache)(get_user_report), calls)
+        no_cache.close()
+
+        registry.reset()
+        cached = ConnectionPool(db_path, max_size=1)
+        results["pooled, cached"] = timed(pooled(cached)(get_user_report), calls)
+        cached.close()
+        stats = registry.stats()
+
+        decorated = decorated_paths(db_path, calls)
+
+    print(f"calls={calls}")
+    for name, micros in results.items():
+        print(f"{name:>18}: {micros:8.1f} us/call")
+    saved = results["pooled, no cache"] - results["pooled, cached"]
+    print(f"compile time saved by statement reuse: {saved:.1f} us/call")
+    print(f"executions={stats['executions']} compiles={stats['compiles']} "
+          f"reuse_ratio={stats['reuse_ratio']:.4f}")
+
+    print("decorated paths on the shared pool:")
+    for name, (micros, path_stats) in decorated.items():
+        print(f"{name:>18}: {micros:8.1f} us/call  "
+              f"reuse_ratio={path_stats['reuse_ratio']:.4f} "
+              f"flushes={path_stats['flushes']}")
+
+
+if __name__ == "__main__":
+    main()
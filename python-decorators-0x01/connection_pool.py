@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Thread-safe SQLite connection pool shared by the decorator tasks.
+
+`with_db_connection` borrows connections from the module-level pool
+instead of calling sqlite3.connect("users.db") on every call.
+
+Features:
+- configurable database path and maximum pool size
+- health check (SELECT 1) when a connection is checked out
+- per-thread affinity: a thread gets back the connection it used last,
+  keeping SQLite's page cache and statement cache warm
+- idle eviction of connections unused for `idle_timeout` seconds
+- a configurable per-connection statement cache (`cached_statements`),
+  with reuse tracked in statement_cache.registry
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from statement_cache import TrackingConnection
+
+
+class ConnectionPool:
+    """
+    A bounded pool of SQLite connections.
+
+    Connections are opened with check_same_thread=False so an idle
+    connection can be handed to another thread when the calling thread
+    has none of its own; each connection is still used by one thread at
+    a time.
+    """
+
+    def __init__(self, db_path="users.db", max_size=8, idle_timeout=300.0,
+                 checkout_timeout=30.0, cached_statements=256,
+                 track_statements=True, **connect_kwargs):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.db_path = db_path
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.cached_statements = cached_statements
+        self.track_statements = track_statements
+        self.connect_kwargs = connect_kwargs
+
+        self._cond = threading.Condition()
+        # thread id -> list of (connection, last_used) idle for that thread
+        self._idle = {}
+        self._size = 0
+        self._closed = False
+
+    def _connect(self):
+        """Opens a new connection for the pool."""
+        kwargs = dict(self.connect_kwargs)
+        if self.track_statements:
+            kwargs.setdefault("factory", TrackingConnection)
+        conn = sqlite3.connect(
+            self.db_path, check_same_thread=False,
+            cached_statements=self.cached_statements, **kwargs
+        )
+        if isinstance(conn, TrackingConnection):
+            conn.statement_capacity = self.cached_statements
+        return conn
+
+    @staticmethod
+    def _is_healthy(conn):
+        """Returns True if the connection still answers a trivial query."""
+        try:
+            # Bypass statement tracking so health checks do not skew reuse stats
+            sqlite3.Connection.execute(conn, "SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _forget(self, conn):
+        """Frees `conn`'s slot. Caller holds the lock and closes `conn` after."""
+        self._size -= 1
+        self._cond.notify()
+
+    @staticmethod
+    def _close(conns):
+        """Closes connections; called without holding the lock."""
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def _evict_idle(self, now):
+        """
+        Removes connections idle for too long and returns them for the
+        caller to close. Caller holds the lock.
+        """
+        if self.idle_timeout is None:
+            return []
+        stale = []
+        for thread_id in list(self._idle):
+            fresh = []
+            for conn, last_used in self._idle[thread_id]:
+                if now - last_used > self.idle_timeout:
+                    self._forget(conn)
+                    stale.append(conn)
+                else:
+                    fresh.append((conn, last_used))
+            if fresh:
+                self._idle[thread_id] = fresh
+            else:
+                del self._idle[thread_id]
+        return stale
+
+    def _take_idle(self, thread_id):
+        """Pops an idle connection, preferring this thread's. Caller holds the lock."""
+        own = self._idle.get(thread_id)
+        if own:
+            conn, _ = own.pop()
+            if not own:
+                del self._idle[thread_id]
+            return conn
+        for other_id in list(self._idle):
+            conn, _ = self._idle[other_id].pop()
+            if not self._idle[other_id]:
+                del self._idle[other_id]
+            return conn
+        return None
+
+    def acquire(self):
+        """
+        Checks a connection out of the pool.
+
+        Blocks up to `checkout_timeout` seconds while the pool is at
+        `max_size` with every connection in use. The lock is only held
+        to pick a connection; the health check, closing stale
+        connections and opening new ones happen outside it.
+
+        Raises:
+            TimeoutError: if no connection became available in time
+            RuntimeError: if the pool has been closed
+        """
+        thread_id = threading.get_ident()
+        deadline = time.monotonic() + self.checkout_timeout
+        stale = []  # connections to close once the lock is released
+
+        try:
+            while True:
+                with self._cond:
+                    while True:
+                        if self._closed:
+                            raise RuntimeError("Connection pool is closed")
+
+                        stale.extend(self._evict_idle(time.monotonic()))
+                        conn = self._take_idle(thread_id)
+                        if conn is not None:
+                            break
+                        if self._size < self.max_size:
+                            self._size += 1
+                            break
+
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise TimeoutError(
+                                f"No database connection available after {self.checkout_timeout}s"
+                            )
+                        self._cond.wait(remaining)
+
+                if conn is None:
+                    # Open outside the lock; give the slot back if connecting fails
+                    try:
+                        return self._connect()
+                    except Exception:
+                        with self._cond:
+                            self._size -= 1
+                            self._cond.notify()
+                        raise
+
+                if self._is_healthy(conn):
+                    return conn
+                with self._cond:
+                    self._forget(conn)
+                stale.append(conn)
+        finally:
+            self._close(stale)
+
+    def release(self, conn):
+        """
+        Returns a connection to the pool.
+
+        Any transaction left open is rolled back (outside the pool lock),
+        matching what closing the connection used to do.
+        """
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            with self._cond:
+                self._forget(conn)
+            self._close([conn])
+            return
+
+        with self._cond:
+            if self._closed:
+                self._forget(conn)
+                stale = [conn]
+            else:
+                now = time.monotonic()
+                self._idle.setdefault(threading.get_ident(), []).append((conn, now))
+                stale = self._evict_idle(now)
+                self._cond.notify()
+        self._close(stale)
+
+    @contextmanager
+    def connection(self):
+        """Context manager that checks a connection out and back in."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Closes every idle connection; busy ones are closed on release."""
+        with self._cond:
+            self._closed = True
+            idle = [conn for entries in self._idle.values() for conn, _ in entries]
+            for conn in idle:
+                self._forget(conn)
+            self._idle.clear()
+            self._cond.notify_all()
+        self._close(idle)
+
+    @property
+    def size(self):
+        """Number of open connections, idle or in use."""
+        with self._cond:
+            return self._size
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def configure_pool(db_path="users.db", **kwargs):
+    """
+    Replaces the shared pool used by `with_db_connection`.
+
+    Accepts the same arguments as ConnectionPool. The previous pool, if
+    any, is closed.
+    """
+    global _pool
+    with _pool_lock:
+        old, _pool = _pool, ConnectionPool(db_path, **kwargs)
+    if old is not None:
+        old.close()
+    return _pool
+
+
+def get_pool():
+    """Returns the shared pool, creating one for users.db on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool()
+        return _pool
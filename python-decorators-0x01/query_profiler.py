@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+In-process query profiling registry used by `log_queries`.
+
+Queries are grouped by fingerprint: the normalized SQL with literals
+replaced by `?`, so "WHERE id = 1" and "WHERE id = 2" share statistics.
+For each fingerprint the registry keeps call and row counts plus a
+bounded window of recent durations from which p50/p95/p99 are computed.
+"""
+
+import re
+import sqlite3
+import threading
+from collections import deque
+
+from result_cache import normalize_sql
+
+
+_LITERALS = re.compile(
+    r"""'(?:[^']|'')*'"""            # string literals
+    r"""|\b\d+(?:\.\d+)?\b"""        # numeric literals
+    r"""|\bx'[0-9a-f]*'""",          # blob literals
+    re.IGNORECASE,
+)
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def fingerprint(sql):
+    """
+    Returns the fingerprint of a SQL statement.
+
+    >>> fingerprint("SELECT * FROM users WHERE id IN (1, 2, 3) AND name = 'x'")
+    'SELECT * FROM users WHERE id IN (?) AND name = ?'
+    """
+    sql = _LITERALS.sub("?", normalize_sql(sql))
+    return _IN_LIST.sub("(?)", sql)
+
+
+# Prefix of the single entry explain_query_plan returns when EXPLAIN fails
+PLAN_UNAVAILABLE = "unavailable: "
+
+
+def explain_query_plan(conn, sql, params=()):
+    """Returns the EXPLAIN QUERY PLAN details of `sql` as a list of strings."""
+    try:
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    except sqlite3.Error as exc:
+        return [f"{PLAN_UNAVAILABLE}{exc}"]
+    return [row[-1] for row in rows]
+
+
+class FingerprintStats:
+    """Aggregated timings for one query fingerprint."""
+
+    def __init__(self, window):
+        self.calls = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.slow_calls = 0
+        self.plan = None
+        self.durations = deque(maxlen=window)
+
+    def percentile(self, p):
+        """Nearest-rank percentile of the recent durations, in ms."""
+        if not self.durations:
+            return None
+        ordered = sorted(self.durations)
+        index = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+
+class QueryRegistry:
+    """Thread-safe registry of FingerprintStats keyed by fingerprint."""
+
+    def __init__(self, window=1024):
+        self.window = window
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, fp, duration_ms, rows=None, slow=False, plan=None):
+        """Adds one observed execution to the fingerprint's statistics."""
+        with self._lock:
+            stats = self._stats.get(fp)
+            if stats is None:
+                stats = self._stats[fp] = FingerprintStats(self.window)
+            stats.calls += 1
+            stats.rows += rows or 0
+            stats.total_ms += duration_ms
+            stats.max_ms = max(stats.max_ms, duration_ms)
+            stats.durations.append(duration_ms)
+            if slow:
+                stats.slow_calls += 1
+            if plan is not None:
+                stats.plan = plan
+
+    def plan(self, fp):
+        """Returns the captured query plan of a fingerprint, or None."""
+        with self._lock:
+            stats = self._stats.get(fp)
+            return None if stats is None else stats.plan
+
+    def snapshot(self):
+        """
+        Returns {fingerprint: summary dict} with counts and p50/p95/p99.
+
+        Percentiles cover the most recent `window` sampled executions.
+        """
+        with self._lock:
+            return {
+                fp: {
+                    "calls": stats.calls,
+                    "rows": stats.rows,
+                    "mean_ms": stats.total_ms / stats.calls,
+                    "max_ms": stats.max_ms,
+                    "p50_ms": stats.percentile(50),
+                    "p95_ms": stats.percentile(95),
+                    "p99_ms": stats.percentile(99),
+                    "slow_calls": stats.slow_calls,
+                    "plan": stats.plan,
+                }
+                for fp, stats in self._stats.items()
+            }
+
+    def reset(self):
+        """Forgets every recorded execution."""
+        with self._lock:
+            self._stats.clear()
+
+
+registry = QueryRegistry()
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Query-result cache shared by the decorator tasks.
+
+- QueryCache: bounded LRU cache with a TTL and hit/miss/eviction counters,
+  indexed by the tables each entry read
+- make_key: cache key from normalized SQL text plus its bound parameters
+- track_tables: records which tables a block of code reads and writes on
+  a connection
+- invalidate_tables: drops matching entries from every live QueryCache;
+  `transactional` calls it after committing a write
+
+Table dependencies are derived once per SQL text on a read-only side
+connection (see statement_tables) rather than by installing an authorizer
+on the connection doing the work: set_authorizer() expires every prepared
+statement on its connection, which would defeat the pooled connections'
+statement cache. Each invalidation also bumps a per-table generation, so a
+result computed while a write committed is not stored afterwards.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from urllib.request import pathname2url
+
+
+# Quoted strings/identifiers are kept verbatim; other whitespace runs collapse
+_SQL_TOKEN = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*"|\s+)""")
+
+_WRITE_ACTIONS = {sqlite3.SQLITE_INSERT, sqlite3.SQLITE_UPDATE, sqlite3.SQLITE_DELETE}
+
+_caches = weakref.WeakSet()
+
+# id(connection) -> list of active TableTracker objects
+_trackers = {}
+_trackers_lock = threading.Lock()
+
+# Invalidation clock: every invalidation advances it and stamps the tables
+# it covered; `_all_generation` is stamped by invalidate_all
+_generation_lock = threading.Lock()
+_clock = 0
+_table_generations = {}
+_all_generation = 0
+
+
+def normalize_sql(sql):
+    """
+    Normalizes SQL text so formatting differences share a cache entry.
+
+    Whitespace outside quotes collapses to a single space and a trailing
+    semicolon is dropped; string literals are left untouched.
+    """
+    parts = []
+    for part in _SQL_TOKEN.split(sql.strip()):
+        if part and part.isspace():
+            parts.append(" ")
+        elif part:
+            parts.append(part)
+    return "".join(parts).rstrip("; ")
+
+
+def _freeze(value):
+    """Turns parameters into a hashable equivalent."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def make_key(sql, params=()):
+    """Builds a cache key from the SQL text and its bound parameters."""
+    return (normalize_sql(sql), _freeze(params))
+
+
+class TableTracker:
+    """
+    Sets of table names read and written while tracking was active.
+
+    `complete` is False when some statement's tables could not be derived
+    (e.g. it used a temporary table); callers must then assume it may have
+    touched anything.
+    """
+
+    def __init__(self):
+        self.read = set()
+        self.written = set()
+        self.complete = True
+
+
+class _SideConnection:
+    """Read-only connection with a permanent authorizer, used to prepare
+    statements and collect the tables they access."""
+
+    def __init__(self, db_path):
+        uri = f"file:{pathname2url(db_path)}?mode=ro"
+        self.conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.read = set()
+        self.written = set()
+        self.conn.set_authorizer(self._authorize)
+
+    def _authorize(self, action, arg1, arg2, db_name, trigger):
+        if action == sqlite3.SQLITE_READ:
+            self.read.add(arg1)
+        elif action in _WRITE_ACTIONS:
+            self.written.add(arg1)
+        return sqlite3.SQLITE_OK
+
+    def tables(self, sql, parameters):
+        """
+        Prepares `EXPLAIN sql` (nothing is executed) and returns the
+        (read, written) table sets, or None if it cannot be prepared.
+        """
+        with self.lock:
+            self.read, self.written = set(), set()
+            try:
+                self.conn.execute("EXPLAIN " + sql, parameters or ())
+            except sqlite3.ProgrammingError as exc:
+                # Binding happens after preparing, so the tables are known
+                if not str(exc).startswith("Incorrect number of bindings"):
+                    return None
+            except sqlite3.Error:
+                return None
+            return frozenset(self.read), frozenset(self.written)
+
+
+_side_connections = {}
+# (db_path, sql) -> (read, written) or None, oldest first
+_statement_tables = OrderedDict()
+_UNKNOWN = object()
+_statement_tables_lock = threading.Lock()
+STATEMENT_TABLES_SIZE = 1024
+
+
+def statement_tables(db_path, sql, parameters=None):
+    """
+    Returns the (read, written) tables of `sql` on the database at
+    `db_path`, or None if they cannot be derived. Results are cached per
+    SQL text, so each distinct statement is analysed once.
+    """
+    key = (db_path, sql)
+    # Lock-free fast path; eviction order is by first analysis
+    tables = _statement_tables.get(key, _UNKNOWN)
+    if tables is not _UNKNOWN:
+        return tables
+    with _statement_tables_lock:
+        side = _side_connections.get(db_path)
+        if side is None:
+            try:
+                side = _side_connections[db_path] = _SideConnection(db_path)
+            except sqlite3.Error:
+                return None
+    tables = side.tables(sql, parameters)
+    with _statement_tables_lock:
+        _statement_tables[key] = tables
+        while len(_statement_tables) > STATEMENT_TABLES_SIZE:
+            _statement_tables.popitem(last=False)
+    return tables
+
+
+def _database_path(conn):
+    """Path of `conn`'s main database, or None for in-memory/temporary ones."""
+    path = conn.__dict__.get("_database_path", False)
+    if path is False:
+        # Bypass statement tracking; this is bookkeeping, not a query
+        rows = sqlite3.Connection.execute(conn, "PRAGMA database_list").fetchall()
+        path = next((row[2] for row in rows if row[1] == "main"), "") or None
+        if path is not None:
+            path = os.path.abspath(path)
+        conn.__dict__["_database_path"] = path
+    return path
+
+
+def _authorizer(conn_id):
+    """Builds an authorizer that reports table access to active trackers."""
+    def authorize(action, arg1, arg2, db_name, trigger):
+        if action == sqlite3.SQLITE_READ:
+            for tracker in _trackers.get(conn_id, ()):
+                tracker.read.add(arg1)
+        elif action in _WRITE_ACTIONS:
+            for tracker in _trackers.get(conn_id, ()):
+                tracker.written.add(arg1)
+        return sqlite3.SQLITE_OK
+    return authorize
+
+
+@contextmanager
+def track_tables(conn):
+    """
+    Context manager yielding a TableTracker for statements run on `conn`.
+    The tracker is filled in when the block exits.
+
+    On a statement_cache.TrackingConnection (what the pool hands out) the
+    executed SQL is observed through a statement listener and mapped to
+    tables with statement_tables(), leaving the connection untouched.
+    Other connections fall back to installing an authorizer for the
+    duration of the block, which expires their prepared statements.
+    Trackers can be nested on the same connection.
+    """
+    tracker = TableTracker()
+    if hasattr(conn, "add_statement_listener"):
+        db_path = _database_path(conn)
+        if db_path is not None:
+            statements = []
+
+            def listener(sql, parameters):
+                statements.append((sql, parameters))
+
+            conn.add_statement_listener(listener)
+            try:
+                yield tracker
+            finally:
+                conn.remove_statement_listener(listener)
+                for sql, parameters in statements:
+                    tables = statement_tables(db_path, sql, parameters)
+                    if tables is None:
+                        tracker.complete = False
+                    else:
+                        tracker.read.update(tables[0])
+                        tracker.written.update(tables[1])
+            return
+
+    conn_id = id(conn)
+    with _trackers_lock:
+        active = _trackers.setdefault(conn_id, [])
+        if not active:
+            conn.set_authorizer(_authorizer(conn_id))
+        active.append(tracker)
+    try:
+        yield tracker
+    finally:
+        with _trackers_lock:
+            active.remove(tracker)
+            if not active:
+                del _trackers[conn_id]
+                conn.set_authorizer(None)
+
+
+class QueryCache:
+    """
+    Thread-safe LRU cache of query results with a time-to-live.
+
+    Each entry remembers the tables it read so writes to those tables can
+    invalidate it.
+    """
+
+    def __init__(self, max_entries=256, ttl=300.0):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, expires_at, tables)
+        self._by_table = {}  # table -> set of keys
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale_drops = 0
+        _caches.add(self)
+
+    def _drop(self, key):
+        """Removes an entry and its table index. Caller holds the lock."""
+        _, _, tables = self._entries.pop(key)
+        for table in tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
+
+    def get(self, key):
+        """Returns (True, value) on a hit, (False, None) on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > time.monotonic()):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[0]
+            if entry is not None:
+                # Expired
+                self._drop(key)
+                self.evictions += 1
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value, tables=(), generation=None):
+        """
+        Stores a result, evicting the least recently used entries if full.
+
+        `generation` is current_generation() taken before the result was
+        computed; if any of `tables` has been invalidated since, the result
+        may be stale and is dropped. Returns True if it was stored.
+        """
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        tables = frozenset(table.lower() for table in tables)
+        with self._lock:
+            # Checked under the lock: an invalidation either happened
+            # already (and is seen here) or will drop this entry afterwards
+            if generation is not None and _invalidated_since(tables, generation):
+                self.stale_drops += 1
+                return False
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, expires_at, tables)
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return True
+
+    def invalidate_tables(self, tables):
+        """Drops every entry that read any of `tables`."""
+        with self._lock:
+            for table in tables:
+                for key in list(self._by_table.get(table.lower(), ())):
+                    self._drop(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        """Drops every entry; counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self):
+        """Returns the cache counters as a dict."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "stale_drops": self.stale_drops,
+            }
+
+
+def current_generation():
+    """Invalidation clock value; pass it to QueryCache.set()."""
+    with _generation_lock:
+        return _clock
+
+
+def _invalidated_since(tables, generation):
+    """True if any of `tables` (or everything) was invalidated after `generation`."""
+    with _generation_lock:
+        if _all_generation > generation:
+            return True
+        return any(_table_generations.get(table, 0) > generation for table in tables)
+
+
+def invalidate_tables(tables):
+    """Invalidates entries reading `tables` in every live QueryCache."""
+    global _clock
+    if not tables:
+        return
+    with _generation_lock:
+        _clock += 1
+        for table in tables:
+            _table_generations[table.lower()] = _clock
+    for cache in list(_caches):
+        cache.invalidate_tables(tables)
+
+
+def invalidate_all():
+    """Clears every live QueryCache, e.g. after a write to unknown tables."""
+    global _clock, _all_generation
+    with _generation_lock:
+        _clock += 1
+        _all_generation = _clock
+    for cache in list(_caches):
+        cache.clear()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Prepared-statement reuse tracking for pooled connections.
+
+sqlite3 keeps an LRU cache of compiled statements per connection, keyed
+by the exact SQL text and sized by `cached_statements`. That cache only
+pays off when connections live longer than one call, which is what the
+connection pool provides. TrackingConnection mirrors the cache's
+bookkeeping so the registry can report how many executions compiled a
+statement and how many reused one.
+
+The mirror is only as good as what the connection can observe. Calls
+that make SQLite expire every prepared statement on the connection
+(set_authorizer, set_progress_handler, registering functions or
+collations, executescript) and DDL statements run through it are counted
+as cache flushes, and the next execution of each statement as a compile.
+Schema changes made through other connections are not seen.
+"""
+
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+# Statements that change the schema, which expires prepared statements
+_DDL = re.compile(r"\s*(CREATE|DROP|ALTER|VACUUM|REINDEX|ANALYZE)\b", re.IGNORECASE)
+
+
+class StatementRegistry:
+    """
+    Process-wide counters of statement executions and compilations.
+
+    Totals cover every execution; per-statement counts are kept for the
+    `max_statements` most recently executed SQL texts only, so callers
+    that build SQL dynamically do not grow the registry without bound.
+    """
+
+    def __init__(self, max_statements=1024):
+        self.max_statements = max_statements
+        self._lock = threading.Lock()
+        self._statements = OrderedDict()  # sql -> [executions, compiles]
+        self._executions = 0
+        self._compiles = 0
+        self._flushes = 0
+
+    def record(self, sql, compiled):
+        """Counts one execution of `sql`; `compiled` if it missed the cache."""
+        with self._lock:
+            self._executions += 1
+            if compiled:
+                self._compiles += 1
+            counts = self._statements.get(sql)
+            if counts is None:
+                counts = self._statements[sql] = [0, 0]
+                if len(self._statements) > self.max_statements:
+                    self._statements.popitem(last=False)
+            else:
+                self._statements.move_to_end(sql)
+            counts[0] += 1
+            if compiled:
+                counts[1] += 1
+
+    def record_flush(self):
+        """Counts one event that expired a connection's prepared statements."""
+        with self._lock:
+            self._flushes += 1
+
+    def stats(self):
+        """
+        Returns totals and per-statement counts.
+
+        reuse_ratio is the share of executions that used an already
+        compiled statement.
+        """
+        with self._lock:
+            executions = self._executions
+            compiles = self._compiles
+            return {
+                "executions": executions,
+                "compiles": compiles,
+                "reuses": executions - compiles,
+                "reuse_ratio": (executions - compiles) / executions if executions else 0.0,
+                "flushes": self._flushes,
+                "statements": {
+                    sql: {"executions": c[0], "compiles": c[1]}
+                    for sql, c in self._statements.items()
+                },
+            }
+
+    def reset(self):
+        """Clears every counter."""
+        with self._lock:
+            self._statements.clear()
+            self._executions = 0
+            self._compiles = 0
+            self._flushes = 0
+
+
+registry = StatementRegistry()
+
+
+class TrackingCursor(sqlite3.Cursor):
+    """Cursor that reports executed SQL to its TrackingConnection."""
+
+    def execute(self, sql, parameters=()):
+        self.connection._track(sql, parameters)
+        return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        self.connection._track(sql)
+        return super().executemany(sql, seq_of_parameters)
+
+
+class TrackingConnection(sqlite3.Connection):
+    """
+    Connection that mirrors sqlite3's statement cache to count reuse.
+
+    Use as `sqlite3.connect(..., factory=TrackingConnection)` and set
+    `statement_capacity` to the `cached_statements` value used.
+
+    Statement listeners, `listener(sql, parameters)`, are told about every
+    statement executed through the connection (parameters is None for
+    executemany); result_cache uses them to learn which tables a block of
+    code touched without installing an authorizer.
+    """
+
+    statement_capacity = 128
+    registry = registry
+
+    def add_statement_listener(self, listener):
+        """Starts calling `listener(sql, parameters)` for each statement."""
+        self.__dict__.setdefault("_statement_listeners", []).append(listener)
+
+    def remove_statement_listener(self, listener):
+        """Stops calling a listener added with add_statement_listener."""
+        self.__dict__.get("_statement_listeners", []).remove(listener)
+
+    def _track(self, sql, parameters=None):
+        """Records one execution, updating the mirrored LRU cache."""
+        for listener in self.__dict__.get("_statement_listeners", ()):
+            listener(sql, parameters)
+        seen = self.__dict__.setdefault("_seen_statements", OrderedDict())
+        compiled = sql not in seen
+        if compiled:
+            seen[sql] = True
+            while len(seen) > self.statement_capacity:
+                seen.popitem(last=False)
+        else:
+            seen.move_to_end(sql)
+        self.registry.record(sql, compiled)
+        if _DDL.match(sql):
+            self._flush_statements()
+
+    def _flush_statements(self):
+        """Forgets the mirrored cache: every statement will be recompiled."""
+        self.__dict__.pop("_seen_statements", None)
+        self.registry.record_flush()
+
+    def set_authorizer(self, *args, **kwargs):
+        self._flush_statements()
+        return super().set_authorizer(*args, **kwargs)
+
+    def set_progress_handler(self, *args, **kwargs):
+        self._flush_statements()
+        return super().set_progress_handler(*args, **kwargs)
+
+    def create_function(self, *args, **kwargs):
+        self._flush_statements()
+        return super().create_function(*args, **kwargs)
+
+    def create_aggregate(self, *args, **kwargs):
+        self._flush_statements()
+        return super().create_aggregate(*args, **kwargs)
+
+    def create_collation(self, *args, **kwargs):
+        self._flush_statements()
+        return super().create_collation(*args, **kwargs)
+
+    def executescript(self, *args, **kwargs):
+        self._flush_statements()
+        return super().executescript(*args, **kwargs)
+
+    def cursor(self, factory=TrackingCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        self._track(sql, parameters)
+        return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._track(sql)
+        return super().executemany(sql, seq_of_parameters)
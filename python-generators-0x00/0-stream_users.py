@@ -1,47 +1,83 @@
 #!/usr/bin/python3
 """
 Generator that streams rows from SQLite database one by one.
+
+Rows are read with fetchmany() in chunks of `arraysize` and can be produced
+in several formats; "tuple" skips per-row object construction entirely.
 """
 
 import sqlite3
 import os
+from collections import namedtuple
+from dataclasses import dataclass
+
+
+COLUMNS = ('user_id', 'name', 'email', 'age')
+
+UserTuple = namedtuple('UserTuple', COLUMNS)
+
+
+@dataclass(slots=True)
+class UserRecord:
+    """A user_data row as a __slots__ dataclass."""
+    user_id: str
+    name: str
+    email: str
+    age: int
 
 
-def stream_users():
+def _to_dict(row):
+    """Builds the classic user dictionary from a raw row tuple."""
+    return dict(zip(COLUMNS, row))
+
+
+# Converters from the raw sqlite3 tuple to each supported row format
+ROW_FORMATS = {
+    'tuple': None,
+    'namedtuple': UserTuple._make,
+    'dataclass': lambda row: UserRecord(*row),
+    'dict': _to_dict,
+}
+
+
+def stream_users(row_format='dict', arraysize=1000, db_path='ALX_prodev.db'):
     """
     Generator function that yields rows from user_data table one by one.
     
+    Args:
+        row_format (str): One of "tuple", "namedtuple", "dataclass" or "dict"
+        arraysize (int): Number of rows fetched from SQLite per fetchmany call
+        db_path (str): Path to the SQLite database file
+    
     Yields:
-        dict: A dictionary representing a user record with keys:
-              user_id, name, email, age
+        A user record with fields user_id, name, email, age. With the
+        default "dict" format this is a dictionary keyed by column name.
     """
-    # Connect to the SQLite database
-    db_path = 'ALX_prodev.db'
+    if row_format not in ROW_FORMATS:
+        raise ValueError(f"Unknown row format: {row_format!r}")
+    convert = ROW_FORMATS[row_format]
     
     if not os.path.exists(db_path):
         raise FileNotFoundError(f"Database file {db_path} not found. Please run seed.py first.")
     
     connection = sqlite3.connect(db_path)
-    connection.row_factory = sqlite3.Row  # This allows accessing columns by name
     
     try:
         cursor = connection.cursor()
+        cursor.arraysize = arraysize
         
         # Execute the query to get all users
-        cursor.execute("SELECT * FROM user_data")
+        cursor.execute("SELECT user_id, name, email, age FROM user_data")
         
-        # Fetch rows one by one using the generator
-        row = cursor.fetchone()
-        while row is not None:
-            # Convert the row to a dictionary
-            user_dict = {
-                'user_id': row['user_id'],
-                'name': row['name'],
-                'email': row['email'],
-                'age': row['age']
-            }
-            yield user_dict
-            row = cursor.fetchone()
+        # Fetch rows in chunks and hand them out one by one
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                break
+            if convert is None:
+                yield from rows
+            else:
+                yield from map(convert, rows)
             
     finally:
         # Ensure the connection is closed even if an error occurs
@@ -56,4 +92,4 @@ if __name__ == "__main__":
         print(user)
         user_count += 1
         if user_count >= 5:  # Limit to 5 for testing
-            break
\ No newline at end of file
+            break
@@ -1,11 +1,18 @@
 #!/usr/bin/python3
 """
 Batch processing for large data - fetches and processes users in batches.
+
+stream_users_in_batches reads the table on a single cursor.
+stream_users_in_parallel splits it into rowid ranges that are read by a
+pool of worker processes, each with its own read-only connection.
 """
 
 import sqlite3
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from contextlib import contextmanager
+from urllib.request import pathname2url
 
 
 @contextmanager
@@ -49,6 +56,141 @@ def stream_users_in_batches(batch_size):
             yield batch_dicts
 
 
+def read_only_connection(db_path):
+    """
+    Opens a read-only connection to the database using a file: URI.
+    
+    Args:
+        db_path (str): Path to the SQLite database file
+        
+    Returns:
+        connection: SQLite connection object with row_factory set
+    """
+    uri = f"file:{pathname2url(os.path.abspath(db_path))}?mode=ro"
+    connection = sqlite3.connect(uri, uri=True)
+    connection.row_factory = sqlite3.Row
+    return connection
+
+
+def rowid_shards(db_path, shard_size):
+    """
+    Splits user_data into contiguous rowid ranges of at most shard_size ids.
+    
+    Args:
+        db_path (str): Path to the SQLite database file
+        shard_size (int): Number of rowids covered by each range
+        
+    Returns:
+        list: (first_rowid, last_rowid) tuples, both inclusive
+    """
+    connection = read_only_connection(db_path)
+    try:
+        low, high = connection.execute(
+            "SELECT MIN(rowid), MAX(rowid) FROM user_data"
+        ).fetchone()
+    finally:
+        connection.close()
+    
+    if low is None:
+        return []
+    return [
+        (start, min(start + shard_size - 1, high))
+        for start in range(low, high + 1, shard_size)
+    ]
+
+
+def fetch_shard(db_path, shard, min_age):
+    """
+    Worker: reads one rowid range and keeps users older than min_age.
+    
+    The age filter runs in SQL so only matching rows cross the process
+    boundary.
+    
+    Args:
+        db_path (str): Path to the SQLite database file
+        shard (tuple): (first_rowid, last_rowid), both inclusive
+        min_age (int): Only users with age > min_age are returned
+        
+    Returns:
+        list: The filtered user records as dictionaries
+    """
+    connection = read_only_connection(db_path)
+    try:
+        cursor = connection.execute(
+            "SELECT user_id, name, email, age FROM user_data "
+            "WHERE rowid BETWEEN ? AND ? AND age > ?",
+            (shard[0], shard[1], min_age)
+        )
+        return [dict(row) for row in cursor]
+    finally:
+        connection.close()
+
+
+def stream_users_in_parallel(batch_size, min_age=25, workers=None,
+                             ordered=True, db_path='ALX_prodev.db'):
+    """
+    Generator that reads user_data in parallel, one rowid range per task.
+    
+    At most two tasks per worker are in flight, so memory stays bounded
+    however large the table is.
+    
+    Args:
+        batch_size (int): Number of rowids covered by each batch
+        min_age (int): Only users with age > min_age are yielded
+        workers (int): Number of worker processes (defaults to CPU count)
+        ordered (bool): Yield batches in rowid order (True) or as soon as
+                        each one is ready (False)
+        db_path (str): Path to the SQLite database file
+        
+    Yields:
+        list: A batch of filtered user records as dictionaries; batches
+              with no matching users are skipped
+    """
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Database file {db_path} not found. Please run seed.py first.")
+    
+    workers = workers or os.cpu_count() or 1
+    shards = iter(rowid_shards(db_path, batch_size))
+    max_in_flight = workers * 2
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        def submit_next():
+            shard = next(shards, None)
+            if shard is None:
+                return None
+            return executor.submit(fetch_shard, db_path, shard, min_age)
+        
+        pending = deque()
+        for _ in range(max_in_flight):
+            future = submit_next()
+            if future is None:
+                break
+            pending.append(future)
+        
+        try:
+            while pending:
+                if ordered:
+                    done = [pending.popleft()]
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.remove(future)
+                
+                for future in done:
+                    # Refill the window before handing the batch over
+                    next_future = submit_next()
+                    if next_future is not None:
+                        pending.append(next_future)
+                    
+                    batch = future.result()
+                    if batch:
+                        yield batch
+        finally:
+            # Stop queued work if the consumer exits early
+            for future in pending:
+                future.cancel()
+
+
 def batch_processing(batch_size):
     """
     Processes batches of users and filters those over age 25.
@@ -64,6 +206,19 @@ def batch_processing(batch_size):
                 print(user)
 
 
+def parallel_batch_processing(batch_size, workers=None):
+    """
+    Prints users over age 25 using the parallel sharded reader.
+    
+    Args:
+        batch_size (int): Number of rowids covered by each batch
+        workers (int): Number of worker processes (defaults to CPU count)
+    """
+    for batch in stream_users_in_parallel(batch_size, min_age=25, workers=workers):
+        for user in batch:
+            print(user)
+
+
 if __name__ == "__main__":
     # Test the batch processing
     print("Testing batch processing (users over 25):")
@@ -1,25 +1,28 @@
 #!/usr/bin/python3
 """
 Lazy loading paginated data - simulates fetching paginated data using a generator.
+
+Two pagination modes are supported:
+- "offset": one connection per page with LIMIT/OFFSET (the original behaviour)
+- "keyset": a single connection that resumes after the last user_id seen
 """
 
 import sqlite3
 import os
 
 
-def paginate_users(page_size, offset):
+def paginate_users(page_size, offset, db_path='ALX_prodev.db'):
     """
     Fetches a page of users from the database.
     
     Args:
         page_size (int): Number of records to fetch
         offset (int): Starting position for the records
+        db_path (str): Path to the SQLite database file
         
     Returns:
         list: A list of user records as dictionaries
     """
-    db_path = 'ALX_prodev.db'
-    
     if not os.path.exists(db_path):
         raise FileNotFoundError(f"Database file {db_path} not found. Please run seed.py first.")
     
@@ -37,22 +40,98 @@ def paginate_users(page_size, offset):
         connection.close()
 
 
-def lazy_pagination(page_size):
+def paginate_users_after(connection, page_size, last_user_id=None):
+    """
+    Fetches the page of users that follows `last_user_id` (keyset pagination).
+    
+    Seeks on the user_id primary key index instead of skipping rows with
+    OFFSET, so every page costs the same regardless of how deep it is.
+    
+    Args:
+        connection: Open SQLite connection with row_factory set to sqlite3.Row
+        page_size (int): Number of records to fetch
+        last_user_id (str): user_id of the last record of the previous page,
+                            or None to fetch the first page
+        
+    Returns:
+        list: A list of user records as dictionaries
+    """
+    cursor = connection.cursor()
+    try:
+        if last_user_id is None:
+            cursor.execute(
+                "SELECT * FROM user_data ORDER BY user_id LIMIT ?",
+                (page_size,)
+            )
+        else:
+            cursor.execute(
+                "SELECT * FROM user_data WHERE user_id > ? "
+                "ORDER BY user_id LIMIT ?",
+                (last_user_id, page_size)
+            )
+        return [dict(row) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def lazy_keyset_pagination(page_size, db_path='ALX_prodev.db'):
+    """
+    Generator that lazily loads pages ordered by user_id over one connection.
+    
+    Args:
+        page_size (int): Number of records per page
+        db_path (str): Path to the SQLite database file
+        
+    Yields:
+        list: A page of user records as dictionaries
+    """
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Database file {db_path} not found. Please run seed.py first.")
+    
+    connection = sqlite3.connect(db_path)
+    connection.row_factory = sqlite3.Row
+    
+    try:
+        last_user_id = None
+        while True:
+            page = paginate_users_after(connection, page_size, last_user_id)
+            if not page:
+                break
+            
+            yield page
+            
+            # Resume after the last key seen
+            last_user_id = page[-1]['user_id']
+    finally:
+        # Also runs when the consumer stops iterating early
+        connection.close()
+
+
+def lazy_pagination(page_size, mode='offset', db_path='ALX_prodev.db'):
     """
     Generator that lazily loads paginated data from the database.
     
     Args:
         page_size (int): Number of records per page
+        mode (str): "offset" (LIMIT/OFFSET, one connection per page) or
+                    "keyset" (seek on user_id, one shared connection)
+        db_path (str): Path to the SQLite database file
         
     Yields:
         list: A page of user records as dictionaries
     """
+    if mode == 'keyset':
+        yield from lazy_keyset_pagination(page_size, db_path)
+        return
+    if mode != 'offset':
+        raise ValueError(f"Unknown pagination mode: {mode!r}")
+    
     offset = 0
     
     # Single loop as required
     while True:
         # Fetch the next page
-        page = paginate_users(page_size, offset)
+        page = paginate_users(page_size, offset, db_path)
         
         # If no more records, break the loop
         if not page:
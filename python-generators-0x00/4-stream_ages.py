@@ -2,21 +2,40 @@
 """
 Memory-Efficient Aggregation with Generators
 Calculate average age without loading entire dataset into memory.
+
+aggregate_ages() compiles common reductions into a single SQL query and
+only falls back to streaming ages through Python (Welford's algorithm)
+for reductions SQLite cannot compute itself.
 """
 
 import sqlite3
 import os
+import math
+
+
+# Reductions that SQLite evaluates in one query
+SQL_REDUCTIONS = {
+    'avg': "SELECT AVG(age) FROM user_data",
+    'sum': "SELECT SUM(age) FROM user_data",
+    'min': "SELECT MIN(age) FROM user_data",
+    'max': "SELECT MAX(age) FROM user_data",
+    'count': "SELECT COUNT(age) FROM user_data",
+}
+
+# Reductions computed by streaming ages through RunningStats
+STREAMING_REDUCTIONS = ('variance', 'stddev')
 
 
-def stream_user_ages():
+def stream_user_ages(db_path='ALX_prodev.db'):
     """
     Generator that yields user ages one by one from the database.
     
+    Args:
+        db_path (str): Path to the SQLite database file
+    
     Yields:
         int: Age of a user
     """
-    db_path = 'ALX_prodev.db'
-    
     if not os.path.exists(db_path):
         raise FileNotFoundError(f"Database file {db_path} not found. Please run seed.py first.")
     
@@ -36,26 +55,191 @@ def stream_user_ages():
         connection.close()
 
 
-def calculate_average_age():
+def calculate_average_age(db_path='ALX_prodev.db'):
+    """
+    Calculates the average age of users with a single AVG() query,
+    so no rows are streamed through Python.
+    
+    Args:
+        db_path (str): Path to the SQLite database file
+    
+    Returns:
+        float: Average age of users (0 if there are none)
+    """
+    average = aggregate_ages('avg', db_path)
+    if average is None:
+        return 0  # Empty table
+    
+    return average
+
+
+class RunningStats:
+    """
+    Numerically stable streaming statistics (Welford's algorithm).
+    
+    Keeps count, mean and the sum of squared deviations so the variance
+    can be read at any point without storing the values.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def push(self, value):
+        """Adds one value to the running statistics."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self):
+        """Population variance of the values seen so far."""
+        if self.count == 0:
+            return 0.0
+        return self.m2 / self.count
+
+    @property
+    def stddev(self):
+        """Population standard deviation of the values seen so far."""
+        return math.sqrt(self.variance)
+
+
+def _connect(db_path):
+    """Opens the database, raising FileNotFoundError if it is missing."""
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Database file {db_path} not found. Please run seed.py first.")
+    return sqlite3.connect(db_path)
+
+
+def percentile_ages(percentiles, db_path='ALX_prodev.db'):
+    """
+    Computes several percentiles of ages in SQL, with linear interpolation.
+    
+    Every distinct rank costs one ORDER BY age LIMIT 2 OFFSET seek on
+    idx_user_age, run on a single connection; only the two rows around
+    each rank are read back.
+    
+    Args:
+        percentiles (iterable): Percentiles between 0 and 100
+        db_path (str): Path to the SQLite database file
+        
+    Returns:
+        dict: Each percentile mapped to its value (None if the table is empty)
+    """
+    percentiles = list(percentiles)
+    if not all(0 <= p <= 100 for p in percentiles):
+        raise ValueError("percentile must be between 0 and 100")
+    
+    connection = _connect(db_path)
+    try:
+        count = connection.execute("SELECT COUNT(age) FROM user_data").fetchone()[0]
+        if count == 0:
+            return dict.fromkeys(percentiles)
+        
+        ranks = {p: (count - 1) * p / 100 for p in percentiles}
+        neighbours = {}
+        for lower in sorted({math.floor(rank) for rank in ranks.values()}):
+            neighbours[lower] = [row[0] for row in connection.execute(
+                "SELECT age FROM user_data WHERE age IS NOT NULL "
+                "ORDER BY age LIMIT 2 OFFSET ?",
+                (lower,)
+            )]
+    finally:
+        connection.close()
+    
+    result = {}
+    for p, rank in ranks.items():
+        lower = math.floor(rank)
+        ages = neighbours[lower]
+        if rank == lower or len(ages) == 1:
+            result[p] = float(ages[0])
+        else:
+            result[p] = ages[0] + (ages[1] - ages[0]) * (rank - lower)
+    return result
+
+
+def percentile_age(p, db_path='ALX_prodev.db'):
     """
-    Calculates the average age of users using the generator.
-    Uses memory-efficient approach without loading all data at once.
+    Computes the p-th percentile of ages (see percentile_ages).
     
+    Args:
+        p (float): Percentile between 0 and 100
+        db_path (str): Path to the SQLite database file
+        
+    Returns:
+        float: The percentile, or None if the table is empty
+    """
+    return percentile_ages([p], db_path)[p]
+
+
+def age_histogram(bucket_size=10, db_path='ALX_prodev.db'):
+    """
+    Counts users per age bucket with a single GROUP BY query.
+    
+    Args:
+        bucket_size (int): Width of each bucket in years
+        db_path (str): Path to the SQLite database file
+        
+    Returns:
+        dict: Lower bound of each bucket mapped to its user count,
+              in ascending bucket order
+    """
+    if bucket_size < 1:
+        raise ValueError("bucket_size must be at least 1")
+    
+    connection = _connect(db_path)
+    try:
+        rows = connection.execute(
+            "SELECT (age / ?) * ? AS bucket, COUNT(*) FROM user_data "
+            "WHERE age IS NOT NULL GROUP BY bucket ORDER BY bucket",
+            (bucket_size, bucket_size)
+        ).fetchall()
+    finally:
+        connection.close()
+    
+    return dict(rows)
+
+
+def aggregate_ages(reduction, db_path='ALX_prodev.db'):
+    """
+    Computes a reduction over user ages, pushing it into SQL when possible.
+    
+    Supported reductions:
+    - avg, sum, min, max, count: one SQL aggregate query
+    - p50, p95, p99 (any "p<number>"): see percentile_ages
+    - variance, stddev: streamed through RunningStats
+    
+    Args:
+        reduction (str): Name of the reduction
+        db_path (str): Path to the SQLite database file
+        
     Returns:
-        float: Average age of users
+        The reduced value (None for avg/min/max/sum on an empty table)
     """
-    total_age = 0
-    count = 0
+    if reduction in SQL_REDUCTIONS:
+        connection = _connect(db_path)
+        try:
+            return connection.execute(SQL_REDUCTIONS[reduction]).fetchone()[0]
+        finally:
+            connection.close()
     
-    # Second loop: iterate through ages from generator
-    for age in stream_user_ages():
-        total_age += age
-        count += 1
+    if reduction.startswith('p'):
+        try:
+            p = float(reduction[1:])
+        except ValueError:
+            pass
+        else:
+            return percentile_age(p, db_path)
     
-    if count == 0:
-        return 0  # Avoid division by zero
+    if reduction in STREAMING_REDUCTIONS:
+        stats = RunningStats()
+        for age in stream_user_ages(db_path):
+            stats.push(age)
+        return getattr(stats, reduction)
     
-    return total_age / count
+    raise ValueError(f"Unsupported reduction: {reduction!r}")
 
 
 if __name__ == "__main__":
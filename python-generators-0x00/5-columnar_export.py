@@ -0,0 +1,235 @@
+#!/usr/bin/python3
+"""
+Columnar export of user_data.
+
+Streams the table into typed column buffers in fixed-size record batches:
+- age as array('i')
+- user_id, name and email as Arrow-style string columns (one contiguous
+  UTF-8 byte buffer plus an array('q') of offsets)
+
+write_columnar() appends the batches to one raw file per buffer, and
+load_column() maps those files back with mmap so a column can be read
+without copying it or re-running the SQL scan.
+
+On-disk layout (native byte order, recorded in meta.json):
+    <dir>/meta.json
+    <dir>/age.i32
+    <dir>/<name>.offsets.i64 and <dir>/<name>.data.utf8 for string columns
+"""
+
+import json
+import mmap
+import os
+import sqlite3
+import sys
+from array import array
+
+
+FORMAT_VERSION = 1
+
+INT_COLUMNS = ('age',)
+STRING_COLUMNS = ('user_id', 'name', 'email')
+COLUMNS = ('user_id', 'name', 'email', 'age')
+
+
+class StringColumn:
+    """
+    Growable string column: UTF-8 bytes stored back to back in one buffer.
+
+    offsets[i] and offsets[i + 1] delimit the i-th value, so there is
+    always one more offset than there are values.
+    """
+
+    def __init__(self):
+        self.offsets = array('q', [0])
+        self.data = bytearray()
+
+    def append(self, value):
+        """Appends one string to the column."""
+        self.data += value.encode('utf-8')
+        self.offsets.append(len(self.data))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("column index out of range")
+        return self.data[self.offsets[index]:self.offsets[index + 1]].decode('utf-8')
+
+
+class MappedStringColumn:
+    """
+    Read-only string column backed by memory-mapped offsets and data files.
+
+    Values are decoded on access; the buffers themselves are never copied.
+    """
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("column index out of range")
+        return str(self.data[self.offsets[index]:self.offsets[index + 1]], 'utf-8')
+
+
+def stream_record_batches(batch_size, db_path='ALX_prodev.db'):
+    """
+    Generator that yields user_data as columnar record batches.
+
+    Args:
+        batch_size (int): Maximum number of rows per batch
+        db_path (str): Path to the SQLite database file
+
+    Yields:
+        dict: Column name mapped to array('i') or StringColumn, all of
+              the same length (at most batch_size)
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Database file {db_path} not found. Please run seed.py first.")
+
+    connection = sqlite3.connect(db_path)
+
+    try:
+        cursor = connection.cursor()
+        cursor.arraysize = batch_size
+        cursor.execute("SELECT user_id, name, email, age FROM user_data ORDER BY rowid")
+
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                break
+
+            batch = {name: StringColumn() for name in STRING_COLUMNS}
+            batch['age'] = array('i')
+            for user_id, name, email, age in rows:
+                batch['user_id'].append(user_id)
+                batch['name'].append(name)
+                batch['email'].append(email)
+                batch['age'].append(age)
+            yield batch
+    finally:
+        connection.close()
+
+
+def write_columnar(out_dir, batch_size=65536, db_path='ALX_prodev.db'):
+    """
+    Exports user_data to a directory of memory-mappable column files.
+
+    Batches are appended as they are produced, so memory use is bounded
+    by batch_size rather than by the table size.
+
+    Args:
+        out_dir (str): Directory to write (created if missing)
+        batch_size (int): Rows per record batch
+        db_path (str): Path to the SQLite database file
+
+    Returns:
+        int: Number of rows exported
+    """
+    os.makedirs(out_dir, exist_ok=True)
+
+    files = {'age': open(os.path.join(out_dir, 'age.i32'), 'wb')}
+    for name in STRING_COLUMNS:
+        files[f'{name}.offsets'] = open(os.path.join(out_dir, f'{name}.offsets.i64'), 'wb')
+        files[f'{name}.data'] = open(os.path.join(out_dir, f'{name}.data.utf8'), 'wb')
+
+    row_count = 0
+    batch_count = 0
+    data_sizes = {name: 0 for name in STRING_COLUMNS}
+
+    try:
+        for name in STRING_COLUMNS:
+            array('q', [0]).tofile(files[f'{name}.offsets'])
+
+        for batch in stream_record_batches(batch_size, db_path):
+            batch['age'].tofile(files['age'])
+            for name in STRING_COLUMNS:
+                column = batch[name]
+                # Rebase the batch-local offsets onto the file-wide data buffer
+                base = data_sizes[name]
+                array('q', (base + offset for offset in column.offsets[1:])).tofile(
+                    files[f'{name}.offsets']
+                )
+                files[f'{name}.data'].write(column.data)
+                data_sizes[name] += len(column.data)
+            row_count += len(batch['age'])
+            batch_count += 1
+    finally:
+        for handle in files.values():
+            handle.close()
+
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'byteorder': sys.byteorder,
+        'rows': row_count,
+        'batch_size': batch_size,
+        'batches': batch_count,
+        'columns': {
+            **{name: 'int32' for name in INT_COLUMNS},
+            **{name: 'utf8' for name in STRING_COLUMNS},
+        },
+    }
+    with open(os.path.join(out_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    return row_count
+
+
+def _map_file(path):
+    """Memory-maps a whole file read-only, returning a memoryview of it."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return memoryview(b'')
+        return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def load_column(out_dir, name):
+    """
+    Maps one exported column without copying it.
+
+    Args:
+        out_dir (str): Directory written by write_columnar
+        name (str): Column name
+
+    Returns:
+        memoryview of int32 values for age, MappedStringColumn otherwise
+    """
+    with open(os.path.join(out_dir, 'meta.json')) as f:
+        meta = json.load(f)
+
+    if meta['byteorder'] != sys.byteorder:
+        raise ValueError("Columnar files were written with a different byte order")
+    if name not in meta['columns']:
+        raise KeyError(name)
+
+    if meta['columns'][name] == 'int32':
+        return _map_file(os.path.join(out_dir, f'{name}.i32')).cast('i')
+
+    offsets = _map_file(os.path.join(out_dir, f'{name}.offsets.i64')).cast('q')
+    data = _map_file(os.path.join(out_dir, f'{name}.data.utf8'))
+    return MappedStringColumn(offsets, data)
+
+
+if __name__ == "__main__":
+    # Export the table next to the database and read a column back
+    out_dir = 'user_data.columnar'
+    exported = write_columnar(out_dir)
+    print(f"Exported {exported} rows to {out_dir}/")
+
+    ages = load_column(out_dir, 'age')
+    names = load_column(out_dir, 'name')
+    print(f"Mean age: {sum(ages) / len(ages):.2f}" if len(ages) else "No rows")
+    for i in range(min(5, len(names))):
+        print(names[i], ages[i])
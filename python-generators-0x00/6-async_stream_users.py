@@ -0,0 +1,180 @@
+#!/usr/bin/python3
+"""
+Async generator counterparts of stream_users, stream_users_in_batches and
+lazy_pagination, built on aiosqlite.
+
+Each generator runs a background task that fetches the next batch while
+the consumer is still processing the current one. The hand-over queue is
+bounded by `prefetch`, so a slow consumer pauses the producer instead of
+letting batches pile up in memory (backpressure). Calling aclose() (for
+example through contextlib.aclosing) or cancelling the consuming task
+stops the producer and closes the connection.
+"""
+
+import asyncio
+import os
+import sqlite3
+
+import aiosqlite
+
+
+_DONE = object()
+
+
+def _check_db(db_path):
+    """Raises FileNotFoundError if the database file does not exist."""
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Database file {db_path} not found. Please run seed.py first.")
+
+
+async def _prefetch(fetch_next, prefetch):
+    """
+    Async generator that drives `fetch_next` in a background task.
+
+    Args:
+        fetch_next: Coroutine function returning the next batch, or an
+                    empty list once the data is exhausted
+        prefetch (int): Maximum number of batches fetched ahead
+
+    Yields:
+        list: Batches in the order fetch_next produced them
+    """
+    if prefetch < 1:
+        raise ValueError("prefetch must be at least 1")
+
+    queue = asyncio.Queue(maxsize=prefetch)
+
+    async def producer():
+        try:
+            while True:
+                batch = await fetch_next()
+                if not batch:
+                    break
+                await queue.put(batch)
+        except Exception as exc:
+            await queue.put(exc)
+            return
+        await queue.put(_DONE)
+
+    task = asyncio.create_task(producer())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Runs on normal exhaustion, early exit and cancellation alike
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+async def async_stream_users_in_batches(batch_size, prefetch=2, db_path='ALX_prodev.db'):
+    """
+    Async generator that fetches users from the database in batches.
+
+    Args:
+        batch_size (int): Number of records to fetch in each batch
+        prefetch (int): Number of batches fetched ahead of the consumer
+        db_path (str): Path to the SQLite database file
+
+    Yields:
+        list: A batch of user records as dictionaries
+    """
+    _check_db(db_path)
+
+    async with aiosqlite.connect(db_path) as db:
+        db.row_factory = sqlite3.Row
+        async with db.execute("SELECT * FROM user_data") as cursor:
+            async def fetch_next():
+                return [dict(row) for row in await cursor.fetchmany(batch_size)]
+
+            async for batch in _prefetch(fetch_next, prefetch):
+                yield batch
+
+
+async def async_stream_users(batch_size=1000, prefetch=2, db_path='ALX_prodev.db'):
+    """
+    Async generator that yields rows from user_data one by one.
+
+    Rows are read in batches of `batch_size` behind the scenes.
+
+    Args:
+        batch_size (int): Number of records fetched per round trip
+        prefetch (int): Number of batches fetched ahead of the consumer
+        db_path (str): Path to the SQLite database file
+
+    Yields:
+        dict: A user record with keys user_id, name, email, age
+    """
+    async for batch in async_stream_users_in_batches(batch_size, prefetch, db_path):
+        for user in batch:
+            yield user
+
+
+async def async_lazy_pagination(page_size, prefetch=2, db_path='ALX_prodev.db'):
+    """
+    Async generator that lazily loads pages ordered by user_id.
+
+    Uses keyset pagination over a single connection, like the "keyset"
+    mode of lazy_pagination.
+
+    Args:
+        page_size (int): Number of records per page
+        prefetch (int): Number of pages fetched ahead of the consumer
+        db_path (str): Path to the SQLite database file
+
+    Yields:
+        list: A page of user records as dictionaries
+    """
+    _check_db(db_path)
+
+    async with aiosqlite.connect(db_path) as db:
+        db.row_factory = sqlite3.Row
+        last_user_id = None
+
+        async def fetch_next():
+            nonlocal last_user_id
+            if last_user_id is None:
+                query = "SELECT * FROM user_data ORDER BY user_id LIMIT ?"
+                params = (page_size,)
+            else:
+                query = ("SELECT * FROM user_data WHERE user_id > ? "
+                         "ORDER BY user_id LIMIT ?")
+                params = (last_user_id, page_size)
+            async with db.execute(query, params) as cursor:
+                page = [dict(row) for row in await cursor.fetchall()]
+            if page:
+                last_user_id = page[-1]['user_id']
+            return page
+
+        async for page in _prefetch(fetch_next, prefetch):
+            yield page
+
+
+async def main():
+    """Streams a few users and pages to show the async generators."""
+    print("Testing async_stream_users:")
+    count = 0
+    async for user in async_stream_users(batch_size=10):
+        print(user)
+        count += 1
+        if count >= 5:
+            break
+
+    print("\nTesting async_lazy_pagination (page size: 5):")
+    page_count = 0
+    async for page in async_lazy_pagination(5):
+        page_count += 1
+        print(f"Page {page_count}: {[user['name'] for user in page]}")
+        if page_count >= 3:
+            break
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
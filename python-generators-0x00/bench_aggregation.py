@@ -0,0 +1,62 @@
+#!/usr/bin/python3
+"""
+Benchmark: SQL-pushdown aggregation vs the generator path in 4-stream_ages.
+
+Usage:
+    python3 bench_aggregation.py [rows ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+seed = __import__('seed')
+stream_ages = __import__('4-stream_ages')
+
+
+def generator_average(db_path):
+    """The original calculate_average_age loop, pointed at db_path."""
+    total_age = 0
+    count = 0
+    for age in stream_ages.stream_user_ages(db_path):
+        total_age += age
+        count += 1
+    return total_age / count if count else 0
+
+
+def timed(fn, *args):
+    """Returns (result, seconds) for one call of fn."""
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+
+    print(f"{'rows':>10} {'reduction':>12} {'seconds':>10} {'speedup':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            db_path = os.path.join(tmp, f"users_{size}.db")
+            seed.create_synthetic_database(db_path, size)
+
+            expected, baseline = timed(generator_average, db_path)
+            print(f"{size:>10} {'generator':>12} {baseline:>10.4f} {1:>8.1f}x")
+
+            cases = [
+                ('avg', stream_ages.aggregate_ages, 'avg'),
+                ('p95', stream_ages.aggregate_ages, 'p95'),
+                ('p50/p95/p99', stream_ages.percentile_ages, (50, 95, 99)),
+                ('histogram', stream_ages.age_histogram, 10),
+                ('stddev', stream_ages.aggregate_ages, 'stddev'),
+            ]
+            for label, fn, arg in cases:
+                result, seconds = timed(fn, arg, db_path)
+                if label == 'avg':
+                    assert abs(result - expected) < 1e-9, (result, expected)
+                print(f"{size:>10} {label:>12} {seconds:>10.4f} {baseline / seconds:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
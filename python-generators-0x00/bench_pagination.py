@@ -0,0 +1,49 @@
+#!/usr/bin/python3
+"""
+Benchmark: OFFSET vs keyset pagination in 2-lazy_paginate.
+
+Builds a synthetic user_data table for each size and walks it end to end
+with both modes of lazy_pagination.
+
+Usage:
+    python3 bench_pagination.py [page_size] [rows ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+seed = __import__('seed')
+lazy_paginate = __import__('2-lazy_paginate')
+
+
+def time_full_scan(db_path, page_size, mode):
+    """
+    Walks every page of user_data and returns (rows_seen, seconds).
+    """
+    start = time.perf_counter()
+    rows_seen = 0
+    for page in lazy_paginate.lazy_pagination(page_size, mode=mode, db_path=db_path):
+        rows_seen += len(page)
+    return rows_seen, time.perf_counter() - start
+
+
+def main():
+    page_size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    sizes = [int(arg) for arg in sys.argv[2:]] or [10_000, 100_000, 1_000_000]
+
+    print(f"page_size={page_size}")
+    print(f"{'rows':>10} {'mode':>8} {'seconds':>10} {'rows/sec':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            db_path = os.path.join(tmp, f"users_{size}.db")
+            seed.create_synthetic_database(db_path, size)
+            for mode in ('offset', 'keyset'):
+                rows_seen, seconds = time_full_scan(db_path, page_size, mode)
+                assert rows_seen == size, f"{mode} saw {rows_seen} of {size} rows"
+                print(f"{size:>10} {mode:>8} {seconds:>10.3f} {rows_seen / seconds:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""
+Microbenchmark: row formats of 0-stream_users.stream_users.
+
+Reports streaming throughput (rows/sec) and, for a materialized list of
+rows, the number of live memory blocks and bytes each row costs.
+
+Usage:
+    python3 bench_row_formats.py [rows] [arraysize]
+"""
+
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+seed = __import__('seed')
+stream_users_module = __import__('0-stream_users')
+
+
+def throughput(db_path, row_format, arraysize):
+    """Streams every row without keeping it and returns rows/sec."""
+    start = time.perf_counter()
+    count = 0
+    for _ in stream_users_module.stream_users(row_format, arraysize, db_path):
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def footprint(db_path, row_format, arraysize, rows):
+    """Returns (blocks per row, bytes per row) of the materialized rows."""
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    materialized = list(stream_users_module.stream_users(row_format, arraysize, db_path))
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sys.getallocatedblocks() - blocks_before
+    del materialized
+    return blocks / rows, size / rows
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    arraysize = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    print(f"rows={rows} arraysize={arraysize}")
+    print(f"{'format':>11} {'rows/sec':>12} {'blocks/row':>11} {'bytes/row':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "users.db")
+        seed.create_synthetic_database(db_path, rows)
+        for row_format in stream_users_module.ROW_FORMATS:
+            rate = throughput(db_path, row_format, arraysize)
+            blocks, size = footprint(db_path, row_format, arraysize, rows)
+            print(f"{row_format:>11} {rate:>12.0f} {blocks:>11.2f} {size:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
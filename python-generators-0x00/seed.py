@@ -8,6 +8,12 @@ import sqlite3
 import csv
 from io import StringIO
 import os
+import sys
+import uuid
+import random
+import json
+import time
+from itertools import islice
 
 
 def connect_db():
@@ -83,6 +89,8 @@ def create_table(connection):
         
         # Create index
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_id ON user_data (user_id)")
+        # Covering index for age aggregates (percentiles, histograms)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_age ON user_data (age)")
         
         print("Table user_data created successfully")
         connection.commit()
@@ -144,109 +152,276 @@ def get_csv_data():
     return csv_data
 
 
-def insert_data(connection, data_source):
+DEFAULT_CHUNK_SIZE = 10000
+
+INSERT_QUERY = """
+INSERT INTO user_data (user_id, name, email, age)
+VALUES (?, ?, ?, ?)
+"""
+
+
+class LoadError(Exception):
     """
-    Inserts data into the database if it does not exist.
+    Raised by load_rows when a row cannot be read or inserted.
+    
+    `rows_loaded` counts the rows of the chunks that were committed
+    before the failure; the failing chunk itself was rolled back.
+    """
+
+    def __init__(self, rows_loaded, error):
+        super().__init__(f"load stopped after {rows_loaded} rows: {error}")
+        self.rows_loaded = rows_loaded
+
+
+def tune_connection(connection):
+    """
+    Applies PRAGMA settings suited to bulk loading.
+    
+    WAL lets readers keep working during the load and synchronous=NORMAL
+    only syncs at checkpoints instead of on every commit.
     
     Args:
         connection: SQLite connection object
-        data_source: Source of the data
     """
-    try:
-        cursor = connection.cursor()
-        
-        # Check if table already has data
-        cursor.execute("SELECT COUNT(*) FROM user_data")
-        count = cursor.fetchone()[0]
-        
-        if count > 0:
-            print("Data already exists in the table. Skipping insertion.")
-            return
-        
-        # Get CSV data from string
-        csv_data = get_csv_data()
-        csv_reader = csv.reader(StringIO(csv_data))
-        next(csv_reader)  # Skip header row
-        
-        insert_query = """
-        INSERT INTO user_data (user_id, name, email, age)
-        VALUES (?, ?, ?, ?)
-        """
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute("PRAGMA temp_store=MEMORY")
+
+
+def iter_csv_rows(stream):
+    """
+    Yields user rows from a CSV stream with a user_id,name,email,age header.
+    
+    Args:
+        stream: Text stream positioned at the header row
         
-        batch_data = []
+    Yields:
+        tuple: (user_id, name, email, age)
+    """
+    csv_reader = csv.reader(stream)
+    next(csv_reader, None)  # Skip header row
+    for row in csv_reader:
+        if len(row) >= 4:
+            yield (row[0], row[1], row[2], row[3])
+
+
+def iter_ndjson_rows(stream):
+    """
+    Yields user rows from a stream holding one JSON object per line.
+    
+    Args:
+        stream: Text stream of newline-delimited JSON objects
         
-        for row in csv_reader:
-            if len(row) >= 4:
-                user_id = row[0]
-                name = row[1]
-                email = row[2]
-                age = row[3]
-                
-                batch_data.append((user_id, name, email, age))
+    Yields:
+        tuple: (user_id, name, email, age)
+    """
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        yield (record['user_id'], record['name'], record['email'], record['age'])
+
+
+def iter_user_rows(data_source):
+    """
+    Streams user rows from a CSV or NDJSON file without loading it whole.
+    
+    Files ending in .ndjson or .jsonl are read as NDJSON, everything else
+    as CSV. When `data_source` is not an existing file the bundled sample
+    data from get_csv_data() is used instead.
+    
+    Args:
+        data_source (str): Path to the data file
         
-        # Insert all records
-        cursor.executemany(insert_query, batch_data)
+    Yields:
+        tuple: (user_id, name, email, age)
+    """
+    if not data_source or not os.path.isfile(data_source):
+        yield from iter_csv_rows(StringIO(get_csv_data()))
+        return
+    
+    with open(data_source, newline='', encoding='utf-8') as stream:
+        if data_source.endswith(('.ndjson', '.jsonl')):
+            yield from iter_ndjson_rows(stream)
+        else:
+            yield from iter_csv_rows(stream)
+
+
+def print_progress(total_rows, elapsed):
+    """
+    Default progress reporter for load_rows.
+    
+    Args:
+        total_rows (int): Rows inserted so far
+        elapsed (float): Seconds since the load started
+    """
+    rate = total_rows / elapsed if elapsed else 0
+    print(f"Inserted {total_rows} records ({rate:.0f} rows/sec)")
+
+
+def load_rows(connection, rows, chunk_size=DEFAULT_CHUNK_SIZE, progress=print_progress):
+    """
+    Inserts rows in fixed-size chunks, one explicit transaction per chunk.
+    
+    Only one chunk is held in memory at a time, so peak memory does not
+    depend on how many rows the iterable produces. Each chunk is atomic,
+    the load as a whole is not: if a row cannot be read (e.g. a malformed
+    NDJSON line) or inserted, the chunks before it stay committed and
+    LoadError reports how many rows that is.
+    
+    If the connection already has an open transaction, each chunk runs in
+    a savepoint inside it instead and nothing is committed; the caller
+    decides whether to commit or roll back the whole load.
+    
+    Args:
+        connection: SQLite connection object
+        rows: Iterable of (user_id, name, email, age) tuples
+        chunk_size (int): Number of rows per executemany/transaction
+        progress: Callable taking (total_rows, elapsed) after each chunk,
+                  or None to stay silent
         
-        connection.commit()
-        print(f"Data inserted successfully")
+    Returns:
+        int: Total number of rows inserted
         
-    except Exception as e:
-        print(f"Error inserting data: {e}")
-        connection.rollback()
+    Raises:
+        LoadError: a row could not be read or inserted
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    
+    rows = iter(rows)
+    cursor = connection.cursor()
+    nested = connection.in_transaction
+    total_rows = 0
+    start = time.perf_counter()
+    
+    try:
+        while True:
+            try:
+                chunk = list(islice(rows, chunk_size))
+            except Exception as e:
+                raise LoadError(total_rows, e) from e
+            if not chunk:
+                break
+            
+            try:
+                if nested:
+                    _insert_chunk_in_savepoint(cursor, chunk)
+                else:
+                    cursor.execute("BEGIN")
+                    try:
+                        cursor.executemany(INSERT_QUERY, chunk)
+                        connection.commit()
+                    except Exception:
+                        connection.rollback()
+                        raise
+            except sqlite3.Error as e:
+                raise LoadError(total_rows, e) from e
+            
+            total_rows += len(chunk)
+            if progress:
+                progress(total_rows, time.perf_counter() - start)
     finally:
         cursor.close()
+    
+    return total_rows
 
 
-def insert_data(connection, data_source):
+def _insert_chunk_in_savepoint(cursor, chunk):
+    """Inserts one chunk atomically inside the caller's open transaction."""
+    cursor.execute("SAVEPOINT load_rows")
+    try:
+        cursor.executemany(INSERT_QUERY, chunk)
+    except Exception:
+        cursor.execute("ROLLBACK TO load_rows")
+        raise
+    finally:
+        cursor.execute("RELEASE load_rows")
+
+
+def insert_data(connection, data_source, chunk_size=DEFAULT_CHUNK_SIZE):
     """
     Inserts data into the database if it does not exist.
+    
+    Args:
+        connection: SQLite connection object
+        data_source: Path to a CSV or NDJSON file (see iter_user_rows)
+        chunk_size (int): Number of rows inserted per transaction
+    
+    If the connection already has an open transaction, the rows are loaded
+    inside it (see load_rows): the bulk-load PRAGMAs are skipped, since
+    SQLite refuses them inside a transaction, and the caller's work is
+    never rolled back here.
     """
+    owns_transaction = not connection.in_transaction
     try:
         cursor = connection.cursor()
         
         # Check if table already has data
         cursor.execute("SELECT COUNT(*) FROM user_data")
         count = cursor.fetchone()[0]
+        cursor.close()
         print(f"Current record count in user_data: {count}")
         
         if count > 0:
             print("Data already exists in the table. Skipping insertion.")
             return
         
-        # Get CSV data from string
-        csv_data = get_csv_data()
-        csv_reader = csv.reader(StringIO(csv_data))
-        next(csv_reader)  # Skip header row
-        
-        insert_query = """
-        INSERT INTO user_data (user_id, name, email, age)
-        VALUES (?, ?, ?, ?)
-        """
-        
-        batch_data = []
-        record_count = 0
-        
-        for row in csv_reader:
-            if len(row) >= 4:
-                user_id = row[0]
-                name = row[1]
-                email = row[2]
-                age = row[3]
-                
-                batch_data.append((user_id, name, email, age))
-                record_count += 1
-        
-        # Insert all records
-        cursor.executemany(insert_query, batch_data)
-        
-        connection.commit()
+        if owns_transaction:
+            tune_connection(connection)
+        record_count = load_rows(connection, iter_user_rows(data_source), chunk_size)
         print(f"Successfully inserted {record_count} records")
         
     except Exception as e:
         print(f"Error inserting data: {e}")
-        connection.rollback()
+        if owns_transaction:
+            connection.rollback()
+
+
+def generate_users(count, seed_value=0):
+    """
+    Generates synthetic user rows for benchmarks and load tests.
+    
+    Args:
+        count (int): Number of rows to generate
+        seed_value (int): Seed for the random generator, for repeatable data
+        
+    Yields:
+        tuple: (user_id, name, email, age)
+    """
+    rng = random.Random(seed_value)
+    for i in range(count):
+        user_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        yield (user_id, f"User {i}", f"user{i}@example.com", rng.randint(18, 120))
+
+
+def create_synthetic_database(db_path, count):
+    """
+    Creates (or replaces) a database file filled with `count` synthetic users.
+    
+    Args:
+        db_path (str): Path of the database file to create
+        count (int): Number of rows to insert
+    """
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    
+    connection = sqlite3.connect(db_path)
+    try:
+        connection.execute("""
+        CREATE TABLE user_data (
+            user_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            email TEXT NOT NULL,
+            age INTEGER NOT NULL
+        )
+        """)
+        load_rows(connection, generate_users(count), progress=None)
+        connection.execute("CREATE INDEX idx_user_age ON user_data (age)")
+        connection.commit()
     finally:
-        cursor.close()
+        connection.close()
 
 
 def view_all_data(connection):
@@ -277,7 +452,9 @@ if __name__ == "__main__":
         connection = create_database(connection)
         if connection:
             create_table(connection)
-            insert_data(connection, 'internal_data')
+            # Optional path to a CSV/NDJSON file, e.g. python3 seed.py users.csv
+            data_source = sys.argv[1] if len(sys.argv) > 1 else 'internal_data'
+            insert_data(connection, data_source)
             
             # Verify data was inserted
             cursor = connection.cursor()
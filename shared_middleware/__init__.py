@@ -0,0 +1,7 @@
+"""
+Middleware support code shared by the Django messaging projects
+(Django-Middleware-0x03, Django-signals_orm-0x04).
+
+Each project's settings.py puts the repository root on sys.path so this
+package is importable from both.
+"""
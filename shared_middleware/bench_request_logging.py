@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark: synchronous request logging vs the queued log writer.
+
+Simulates `threads` request threads each logging `requests` lines the way
+RequestLoggingMiddleware does, and reports per-request logging latency
+(p50 / p99 / max) and total throughput for:
+- sync:  open(path, 'a') + write on every request (the old middleware)
+- queue: log_writer.QueuedLogWriter, drop and block policies
+
+Usage:
+    python3 shared_middleware/bench_request_logging.py [threads] [requests_per_thread]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from log_writer import QueuedLogWriter
+
+
+def sync_logger(path):
+    """Returns the old per-request open/append/close logger."""
+    def log(line):
+        with open(path, 'a') as f:
+            f.write(line)
+    return log
+
+
+def run(log, threads, requests_per_thread):
+    """Runs the load and returns (latencies in seconds, wall time)."""
+    latencies = [[] for _ in range(threads)]
+    barrier = threading.Barrier(threads)
+
+    def worker(index):
+        own = latencies[index]
+        barrier.wait()
+        for n in range(requests_per_thread):
+            line = f"{datetime.now()} - User: user{index} - Path: /api/messages/{n}\n"
+            start = time.perf_counter()
+            log(line)
+            own.append(time.perf_counter() - start)
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    wall = time.perf_counter() - start
+    return sorted(l for own in latencies for l in own), wall
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))
+    return sorted_values[index]
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    requests_per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    total = threads * requests_per_thread
+
+    print(f"threads={threads} requests={total}")
+    print(f"{'mode':>12} {'p50 us':>9} {'p99 us':>9} {'max us':>10} "
+          f"{'req/s':>10} {'dropped':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        modes = [
+            ('sync', None),
+            ('queue-drop', {'policy': 'drop'}),
+            ('queue-block', {'policy': 'block'}),
+        ]
+        for name, options in modes:
+            path = os.path.join(tmp, f"{name}.log")
+            writer = None
+            if options is None:
+                log = sync_logger(path)
+            else:
+                writer = QueuedLogWriter(path, **options)
+                log = writer.write
+            latencies, wall = run(log, threads, requests_per_thread)
+            dropped = 0
+            if writer is not None:
+                writer.close()
+                dropped = writer.dropped
+            with open(path) as f:
+                lines = sum(1 for _ in f)
+            assert lines + dropped == total, f"{name}: {lines} + {dropped} != {total}"
+            print(f"{name:>12} {percentile(latencies, 50) * 1e6:>9.1f} "
+                  f"{percentile(latencies, 99) * 1e6:>9.1f} "
+                  f"{latencies[-1] * 1e6:>10.1f} {total / wall:>10.0f} {dropped:>8}")
+
+
+if __name__ == "__main__":
+    main()
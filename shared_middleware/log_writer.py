@@ -0,0 +1,209 @@
+"""
+Queue-backed log file writer used by RequestLoggingMiddleware.
+
+The request thread only puts a line on a bounded queue; a background
+thread drains it in batches and appends each batch with a single
+os.write() on a descriptor opened with O_APPEND. When the queue is full
+the line is either dropped (counted in `dropped`) or the request waits
+for room, depending on `policy`.
+
+Several worker processes (e.g. gunicorn workers) may append to the same
+file: O_APPEND makes every write land at the current end of the file.
+Rotation is therefore left to an external tool such as logrotate; like
+logging.handlers.WatchedFileHandler, the writer notices when the file
+has been moved or removed and reopens the path before its next batch.
+"""
+
+import atexit
+import os
+import queue
+import threading
+
+_STOP = object()
+
+
+class QueuedLogWriter:
+    """
+    Appends lines to `path` from a background thread.
+
+    Args:
+        path: log file to append to
+        max_queue: lines buffered before the overflow policy applies
+        policy: "drop" to discard lines when the queue is full, "block"
+            to wait up to `block_timeout` seconds for room (then drop)
+        batch_size: maximum lines written per batch
+        flush_interval: seconds the writer waits for more lines before
+            writing what it has
+        block_timeout: see `policy` (None waits indefinitely)
+    """
+
+    def __init__(self, path, max_queue=10000, policy="drop", batch_size=256,
+                 flush_interval=0.5, block_timeout=None):
+        if policy not in ("drop", "block"):
+            raise ValueError("policy must be 'drop' or 'block'")
+        self.path = str(path)
+        self.policy = policy
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block_timeout = block_timeout
+
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.reopens = 0
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()  # counters
+        self._lifecycle_lock = threading.Lock()  # starting/stopping the thread
+        self._thread = None
+        self._fd = None
+        self._file_id = None
+
+    def write(self, line):
+        """
+        Queues one line (a trailing newline is added if missing).
+        Returns False if the line was dropped.
+        """
+        if not line.endswith("\n"):
+            line += "\n"
+        self._ensure_worker()
+        try:
+            if self.policy == "block":
+                self._queue.put(line, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(line)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def flush(self):
+        """Blocks until every queued line has been written."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        """
+        Writes what is queued, stops the writer thread and closes the file.
+        A later write() starts a new writer thread and reopens the file.
+        """
+        with self._lifecycle_lock:
+            thread, self._thread = self._thread, None
+            if thread is not None and thread.is_alive():
+                self._queue.put(_STOP)
+                thread.join()
+
+    def stats(self):
+        """Counters of lines written and dropped, batches and reopens."""
+        with self._lock:
+            return {
+                "written": self.written,
+                "dropped": self.dropped,
+                "batches": self.batches,
+                "reopens": self.reopens,
+                "queued": self._queue.qsize(),
+            }
+
+    def _ensure_worker(self):
+        """Starts the writer thread on first use or after close()."""
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            return
+        with self._lifecycle_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="request-log-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        """Writer thread: collects batches and writes them until stopped."""
+        try:
+            while True:
+                try:
+                    first = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+                batch = [first]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = _STOP in batch
+                lines = [line for line in batch if line is not _STOP]
+                try:
+                    if lines:
+                        self._write_batch(lines)
+                except OSError:
+                    # Keep serving requests; the lines are lost
+                    with self._lock:
+                        self.dropped += len(lines)
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+                if stop:
+                    return
+        finally:
+            self._close_file()
+
+    def _write_batch(self, lines):
+        """Appends lines with one write() on the O_APPEND descriptor."""
+        data = "".join(lines).encode("utf-8")
+        self._reopen_if_moved()
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._fd, view):]
+        with self._lock:
+            self.written += len(lines)
+            self.batches += 1
+
+    def _reopen_if_moved(self):
+        """(Re)opens the path if it is not open or was rotated away."""
+        if self._fd is not None:
+            try:
+                stat = os.stat(self.path)
+                if (stat.st_dev, stat.st_ino) == self._file_id:
+                    return
+            except FileNotFoundError:
+                pass
+            self._close_file()
+            with self._lock:
+                self.reopens += 1
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        stat = os.fstat(self._fd)
+        self._file_id = (stat.st_dev, stat.st_ino)
+
+    def _close_file(self):
+        """Closes the descriptor, if open."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+            self._file_id = None
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(path, **options):
+    """
+    Returns the shared writer for `path`, creating it with `options`
+    (QueuedLogWriter arguments) on first use.
+    """
+    path = os.path.abspath(str(path))
+    with _writers_lock:
+        writer = _writers.get(path)
+        if writer is None:
+            writer = _writers[path] = QueuedLogWriter(path, **options)
+        return writer
+
+
+@atexit.register
+def close_writers():
+    """Writes out and closes every shared writer (they reopen if used again)."""
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.close()
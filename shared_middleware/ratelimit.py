@@ -0,0 +1,150 @@
+"""
+Rate-limit backends for OffensiveLanguageMiddleware.
+
+State lives in a Django cache instead of a per-process dict, so every
+worker process sharing the cache (Redis, Memcached, or LocMem in
+development) enforces one limit, and idle clients expire with their
+cache keys instead of accumulating forever.
+
+The backend is chosen with the RATE_LIMIT setting:
+
+    RATE_LIMIT = {
+        'BACKEND': 'shared_middleware.ratelimit.SlidingWindowRateLimiter',
+        'OPTIONS': {'limit': 5, 'window': 60, 'cache_alias': 'default'},
+    }
+"""
+
+import math
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+RateLimitResult = namedtuple(
+    'RateLimitResult', ['allowed', 'limit', 'remaining', 'retry_after']
+)
+RateLimitResult.__doc__ = """
+Outcome of one rate-limit check. `retry_after` is the number of whole
+seconds to wait before the next request can be allowed (0 if allowed).
+"""
+
+
+class SlidingWindowRateLimiter:
+    """
+    Approximate sliding-window counter.
+
+    Each client has one counter per fixed window of `window` seconds. The
+    number of requests in the sliding window ending now is estimated as
+    the current window's count plus the previous window's count weighted
+    by how much of it still overlaps the sliding window. That keeps the
+    state at two integers per active client. Each counter expires after
+    two windows, which evicts idle clients.
+    """
+
+    def __init__(self, limit=5, window=60, cache_alias='default',
+                 key_prefix='ratelimit'):
+        if limit < 1 or window <= 0:
+            raise ValueError("limit must be at least 1 and window positive")
+        self.limit = limit
+        self.window = window
+        self.cache_alias = cache_alias
+        self.key_prefix = key_prefix
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def _key(self, ident, window_index):
+        return f'{self.key_prefix}:{ident}:{window_index}'
+
+    def hit(self, ident, now=None):
+        """
+        Records one request from `ident` (e.g. a client IP) if it is
+        within the limit. Rejected requests are not counted.
+
+        The current window's counter is incremented first and the limit
+        checked against the value incr() returned, so concurrent requests
+        from several workers each see a distinct count; a rejected
+        request's increment is then undone.
+
+        Returns:
+            RateLimitResult
+        """
+        now = time.time() if now is None else now
+        window_index = int(now // self.window)
+        current_key = self._key(ident, window_index)
+        previous_key = self._key(ident, window_index - 1)
+        cache = self.cache
+
+        # add() is a no-op if another worker created the counter first
+        cache.add(current_key, 0, timeout=2 * self.window)
+        try:
+            current = cache.incr(current_key)
+        except ValueError:
+            # Expired between add() and incr()
+            cache.set(current_key, 1, timeout=2 * self.window)
+            current = 1
+        previous = cache.get(previous_key, 0)
+        elapsed = now - window_index * self.window
+        estimate = previous * (1 - elapsed / self.window) + current
+
+        if estimate > self.limit:
+            try:
+                cache.decr(current_key)
+            except ValueError:
+                pass
+            return RateLimitResult(
+                False, self.limit, 0,
+                self._retry_after(current - 1, previous, elapsed),
+            )
+        return RateLimitResult(
+            True, self.limit, max(0, math.floor(self.limit - estimate)), 0
+        )
+
+    def _retry_after(self, current, previous, elapsed):
+        """Seconds until the estimate leaves room for one more request."""
+        room = self.limit - 1
+        if current <= room:
+            # Wait for the previous window's share to decay enough
+            if previous:
+                wait = self.window * (1 - (room - current) / previous) - elapsed
+            else:
+                wait = 0
+        else:
+            # Wait for the next window, then for this window's share to decay
+            wait = self.window - elapsed
+            wait += self.window * (1 - room / current)
+        return max(1, math.ceil(wait))
+
+    def reset(self, ident, now=None):
+        """Forgets every request recorded for `ident`."""
+        now = time.time() if now is None else now
+        window_index = int(now // self.window)
+        self.cache.delete_many([
+            self._key(ident, window_index), self._key(ident, window_index - 1)
+        ])
+
+
+def describe_window(seconds):
+    """Human-readable window length, e.g. "1 minute" or "90 seconds"."""
+    for unit, size in (('hour', 3600), ('minute', 60)):
+        if seconds >= size and seconds % size == 0:
+            count = int(seconds // size)
+            return f"{count} {unit}{'s' if count != 1 else ''}"
+    return f"{seconds:g} second{'s' if seconds != 1 else ''}"
+
+
+def get_rate_limiter(**defaults):
+    """
+    Builds the backend configured by settings.RATE_LIMIT; `defaults`
+    fill in options the setting leaves out.
+    """
+    config = getattr(settings, 'RATE_LIMIT', {})
+    backend = import_string(
+        config.get('BACKEND',
+                   'shared_middleware.ratelimit.SlidingWindowRateLimiter')
+    )
+    options = dict(defaults, **config.get('OPTIONS', {}))
+    return backend(**options)